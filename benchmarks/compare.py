@@ -0,0 +1,140 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+File: compare.py
+
+Description:
+    This script compares two result files of benchmarks/run.py, e.g. of two commits, and reports every benchmark whose
+    throughput dropped or whose peak memory grew by more than a threshold. The exit code is 1 when a regression is found,
+    so the script can gate CI jobs.
+    
+    Usage:
+        python -m benchmarks.compare baseline.json current.json [--threshold 0.1] [--memory-threshold 0.2]
+
+Author:
+    Loc Dang 
+
+Contact:
+    bobdbl99@gmail.com
+    
+Date:
+    October 17, 2026
+
+License:
+    BSD 3-Clause License
+
+    Redistribution and use in source and binary forms, with or without modification,
+    are permitted provided that the following conditions are met:
+
+    1. Redistributions of source code must retain the above copyright notice, this
+       list of conditions and the following disclaimer.
+
+    2. Redistributions in binary form must reproduce the above copyright notice, this
+       list of conditions and the following disclaimer in the documentation and/or
+       other materials provided with the distribution.
+
+    3. Neither the name of the copyright holder nor the names of its contributors
+       may be used to endorse or promote products derived from this software without
+       specific prior written permission.
+
+    THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+    IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+    INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT
+    NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+    PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+    WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+    ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY
+    OF SUCH DAMAGE.
+"""
+
+import sys
+import json
+import argparse
+
+
+def compare(baseline, current, threshold=0.1, memory_threshold=0.2):
+    
+    # Returns one row per benchmark present in both reports: (name, unit, baseline throughput, current throughput,
+    # relative change, baseline peak memory, current peak memory, status)
+    rows = []
+    
+    for name, current_result in current["results"].items():
+        
+        if name not in baseline["results"]:
+            continue
+        
+        baseline_result = baseline["results"][name]
+        
+        change = current_result["throughput"] / baseline_result["throughput"] - 1
+        
+        memory_growth = (current_result["peak_memory"] - baseline_result["peak_memory"]) / max(baseline_result["peak_memory"], 1)
+        
+        if change < -threshold:
+            status = "slower"
+            
+        elif memory_growth > memory_threshold and current_result["peak_memory"] - baseline_result["peak_memory"] > 1024:
+            status = "more memory"
+            
+        elif change > threshold:
+            status = "faster"
+            
+        else:
+            status = "ok"
+        
+        rows.append((name, current_result["unit"], baseline_result["throughput"], current_result["throughput"], change,
+                     baseline_result["peak_memory"], current_result["peak_memory"], status))
+    
+    return rows
+
+def format_report(rows, baseline, current):
+    
+    lines = [f"Baseline: {baseline['metadata'].get('commit')}  Current: {current['metadata'].get('commit')}", ""]
+    
+    lines.append(f"{'benchmark':32s} {'unit':9s} {'baseline':>14s} {'current':>14s} {'change':>8s} {'memory (MB)':>19s}  status")
+    
+    for name, unit, baseline_throughput, current_throughput, change, baseline_memory, current_memory, status in rows:
+        lines.append(f"{name:32s} {unit:9s} {baseline_throughput:14.1f} {current_throughput:14.1f} {change:+8.1%} "
+                     f"{baseline_memory / 1e6:9.2f} {current_memory / 1e6:9.2f}  {status}")
+    
+    return "\n".join(lines)
+
+def parse_args():
+    
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files and report regressions")
+    
+    parser.add_argument("baseline", help="Results of the reference commit")
+    
+    parser.add_argument("current", help="Results of the commit under test")
+    
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative throughput drop reported as a regression")
+    
+    parser.add_argument("--memory-threshold", type=float, default=0.2, help="Relative peak memory growth reported as a regression")
+    
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    
+    with open(args.baseline, "r") as file:
+        baseline = json.load(file)
+    
+    with open(args.current, "r") as file:
+        current = json.load(file)
+    
+    if baseline["metadata"].get("scale") != current["metadata"].get("scale"):
+        print("[Benchmark][Warn] The results were recorded with different workload sizes, throughputs may not be comparable")
+    
+    rows = compare(baseline, current, args.threshold, args.memory_threshold)
+    
+    print(format_report(rows, baseline, current))
+    
+    regressions = [row[0] for row in rows if row[-1] in ("slower", "more memory")]
+    
+    if len(regressions) > 0:
+        
+        print(f"\n[Benchmark][Error] {len(regressions)} regression(s): {', '.join(regressions)}")
+        
+        sys.exit(1)
@@ -0,0 +1,160 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+File: import_time.py
+
+Description:
+    This script checks that the numeric core (Model, Simulator, the numeric models and the batch runners) imports with NumPy
+    only. Every module is imported in a fresh interpreter. The exit code is 1 when CasADi or matplotlib gets imported, or when
+    the import time on top of NumPy exceeds the budget, so the script can gate CI jobs.
+    
+    Usage:
+        python -m benchmarks.import_time [--budget 0.1] [--repeats 5]
+
+Author:
+    Loc Dang 
+
+Contact:
+    bobdbl99@gmail.com
+    
+Date:
+    October 17, 2026
+
+License:
+    BSD 3-Clause License
+
+    Redistribution and use in source and binary forms, with or without modification,
+    are permitted provided that the following conditions are met:
+
+    1. Redistributions of source code must retain the above copyright notice, this
+       list of conditions and the following disclaimer.
+
+    2. Redistributions in binary form must reproduce the above copyright notice, this
+       list of conditions and the following disclaimer in the documentation and/or
+       other materials provided with the distribution.
+
+    3. Neither the name of the copyright holder nor the names of its contributors
+       may be used to endorse or promote products derived from this software without
+       specific prior written permission.
+
+    THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+    IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+    INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT
+    NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+    PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+    WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+    ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY
+    OF SUCH DAMAGE.
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+PACKAGE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Modules used by simulations and pool workers. Plotting and CasADi must only be loaded on first use
+CORE_MODULES = ["simple_dynamics_simulator.model",
+                "simple_dynamics_simulator.simulator",
+                "simple_dynamics_simulator.events",
+                "simple_dynamics_simulator.sweep",
+                "simple_dynamics_simulator.monte_carlo",
+                "simple_dynamics_simulator.multi_agent",
+                "simple_dynamics_simulator.checkpoint",
+                "models.tractor_trailer_model"]
+
+HEAVY_MODULES = ("casadi", "matplotlib")
+
+# Runs in the fresh interpreter. NumPy is imported first, since it is needed anyway and dominates the import time
+PROBE = """
+import sys, json, time, importlib
+start = time.perf_counter()
+import numpy
+numpy_time = time.perf_counter() - start
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+import_time = time.perf_counter() - start
+print(json.dumps({"numpy": numpy_time, "module": import_time,
+                  "heavy": sorted({name.split(".")[0] for name in sys.modules} & set(sys.argv[2:]))}))
+"""
+
+
+def measure(module, repeats=5):
+    
+    # Best of repeats, each in a new interpreter so nothing is cached in sys.modules
+    results = []
+    
+    for _ in range(repeats):
+        
+        output = subprocess.run([sys.executable, "-c", PROBE, module, *HEAVY_MODULES], cwd=PACKAGE_PATH,
+                                capture_output=True, text=True)
+        
+        if output.returncode != 0:
+            raise Exception(f"Failed to import '{module}'.\n{output.stderr}")
+        
+        results.append(json.loads(output.stdout))
+    
+    return min(results, key=lambda result: result["module"])
+
+def check(modules, budget, repeats=5):
+    
+    # Returns one row per module: (module, NumPy import time, import time on top of NumPy, heavy modules, status)
+    rows = []
+    
+    for module in modules:
+        
+        result = measure(module, repeats)
+        
+        if len(result["heavy"]) > 0:
+            status = "imports " + ", ".join(result["heavy"])
+            
+        elif result["module"] > budget:
+            status = "over budget"
+            
+        else:
+            status = "ok"
+        
+        rows.append((module, result["numpy"], result["module"], result["heavy"], status))
+    
+    return rows
+
+def format_report(rows, budget):
+    
+    lines = [f"{'module':40s} {'numpy (ms)':>10s} {'module (ms)':>11s}  status (budget {budget * 1e3:.0f} ms)"]
+    
+    for module, numpy_time, module_time, _, status in rows:
+        lines.append(f"{module:40s} {numpy_time * 1e3:10.1f} {module_time * 1e3:11.1f}  {status}")
+    
+    return "\n".join(lines)
+
+def parse_args():
+    
+    parser = argparse.ArgumentParser(description="Check that the numeric core imports quickly and without CasADi or matplotlib")
+    
+    parser.add_argument("--budget", type=float, default=0.1, help="Allowed import time of each module on top of NumPy in seconds")
+    
+    parser.add_argument("--repeats", type=int, default=5, help="Number of fresh interpreters per module, the fastest counts")
+    
+    parser.add_argument("--module", action="append", default=None, help="Module to check instead of the core modules, may be repeated")
+    
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    
+    rows = check(args.module or CORE_MODULES, args.budget, args.repeats)
+    
+    print(format_report(rows, args.budget))
+    
+    failures = [row[0] for row in rows if row[-1] != "ok"]
+    
+    if len(failures) > 0:
+        
+        print(f"\n[Benchmark][Error] {len(failures)} module(s) failed the import check: {', '.join(failures)}")
+        
+        sys.exit(1)
@@ -0,0 +1,337 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+File: run.py
+
+Description:
+    This script runs the benchmark suite of the simulator's hot paths and saves the results as JSON. Every benchmark
+    reports its throughput (steps/s, frames/s or MB/s), the best wall time over several repeats and the peak memory
+    allocated by Python while it runs. Results of two commits are compared with benchmarks/compare.py.
+    
+    Usage:
+        python -m benchmarks.run --output results.json [--filter simulate] [--repeats 5] [--quick]
+
+Author:
+    Loc Dang 
+
+Contact:
+    bobdbl99@gmail.com
+    
+Date:
+    October 17, 2026
+
+License:
+    BSD 3-Clause License
+
+    Redistribution and use in source and binary forms, with or without modification,
+    are permitted provided that the following conditions are met:
+
+    1. Redistributions of source code must retain the above copyright notice, this
+       list of conditions and the following disclaimer.
+
+    2. Redistributions in binary form must reproduce the above copyright notice, this
+       list of conditions and the following disclaimer in the documentation and/or
+       other materials provided with the distribution.
+
+    3. Neither the name of the copyright holder nor the names of its contributors
+       may be used to endorse or promote products derived from this software without
+       specific prior written permission.
+
+    THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+    IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+    INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT
+    NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+    PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+    WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+    ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY
+    OF SUCH DAMAGE.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import tracemalloc
+import subprocess
+import numpy as np
+
+PACKAGE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PACKAGE_PATH)
+
+from benchmarks.scenarios import HORIZONS, METHODS, NUM_STATES, make_model, make_initial_state, make_inputs, make_states, make_environment, load_animator_params
+from simple_dynamics_simulator.simulator import Simulator
+from simple_dynamics_simulator.sink import CsvSink
+from simple_dynamics_simulator.result_store import ResultStore
+from simple_dynamics_simulator.data_loader import load_csv_columns
+from simple_dynamics_simulator.graphic.animator import Animator
+
+# Quick runs shrink every workload by this factor, e.g. for a smoke test
+QUICK_FACTOR = 10
+
+
+class Benchmark:
+    
+    def __init__(self, name, unit, setup):
+        
+        # setup(scale, folder) prepares the inputs outside the measurement and returns (function, amount of work per call).
+        # Files may only be written inside folder. Throughput is work / seconds in the given unit
+        self.name = name
+        
+        self.unit = unit
+        
+        self.setup = setup
+
+
+def simulate_benchmark(horizon, method, num_states):
+    
+    def setup(scale, folder):
+        
+        simulator = Simulator(make_model(num_states, method))
+        
+        inputs = make_inputs(max(HORIZONS[horizon] // scale, 1))
+        
+        intial_state = make_initial_state(num_states)
+        
+        return lambda: simulator.run(intial_state, inputs), inputs.shape[1]
+    
+    return Benchmark(f"simulate/{horizon}/{method}/nx{num_states}", "steps/s", setup)
+
+def model_step_benchmark(method, num_states):
+    
+    def setup(scale, folder):
+        
+        model = make_model(num_states, method)
+        
+        state, input = make_initial_state(num_states), np.array([0.5, 0.1])
+        
+        steps = 10000 // scale
+        
+        def function():
+            for _ in range(steps):
+                model.step(state, input)
+        
+        return function, steps
+    
+    return Benchmark(f"model_step/{method}/nx{num_states}", "steps/s", setup)
+
+def graphic_model_benchmark(batch):
+    
+    def setup(scale, folder):
+        
+        model = make_model()
+        
+        states = make_states(HORIZONS["long"] // scale)
+        
+        if batch:
+            return lambda: model.graphic_model_batch(states), states.shape[1]
+        
+        return lambda: [model.graphic_model(states[:, i]) for i in range(states.shape[1])], states.shape[1]
+    
+    return Benchmark("graphic_model_batch" if batch else "graphic_model", "frames/s", setup)
+
+def dynamic_artists_benchmark():
+    
+    def setup(scale, folder):
+        
+        animator = Animator(load_animator_params(), make_model(), headless=True)
+        
+        states = make_states(HORIZONS["short"] // scale)
+        
+        dynamic_paths = {"Trailer trajectory": states[0:2]}
+        
+        return lambda: animator._generate_dynamic_artists(states, dynamic_paths), states.shape[1]
+    
+    return Benchmark("animator/dynamic_artists", "frames/s", setup)
+
+def render_benchmark(environment_size):
+    
+    def setup(scale, folder):
+        
+        # Offscreen rendering as done by Animator.export, including the static environment
+        animator = Animator(load_animator_params(), make_model(), headless=True)
+        
+        model = make_model()
+        
+        states = make_states(max(20 // scale, 2))
+        
+        dynamic_paths = {"Trailer trajectory": states[0:2]}
+        
+        animator._configure_plot_setting([], dynamic_paths.keys())
+        
+        animator._draw_static({}, make_environment(environment_size))
+        
+        graphic_model_batch = model.graphic_model_batch(states)
+        
+        path_lines, robot_patches = animator._generate_lazy_artists(graphic_model_batch, dynamic_paths, animated=False)
+        
+        def function():
+            for frame in range(states.shape[1]):
+                
+                animator._update_lazy_artists(frame, graphic_model_batch, dynamic_paths, path_lines, robot_patches)
+                
+                animator._figure.canvas.draw()
+        
+        return function, states.shape[1]
+    
+    return Benchmark(f"animator/render/{environment_size}", "frames/s", setup)
+
+def io_benchmark(kind):
+    
+    def setup(scale, folder):
+        
+        steps = HORIZONS["long"] * 5 // scale
+        
+        time_axis, states, inputs = np.arange(steps) * 0.2, make_states(steps), make_inputs(steps)
+        
+        num_bytes = (1 + states.shape[0] + inputs.shape[0]) * steps * 8
+        
+        csv_path = os.path.join(folder, "output.csv")
+        
+        store_path = os.path.join(folder, "output_store")
+        
+        def write_csv():
+            
+            sink = CsvSink(csv_path, ["x2", "y2", "theta2", "gamma"], ["v", "w"])
+            
+            sink.write(time_axis, states, inputs)
+            
+            sink.close()
+        
+        def write_store():
+            
+            store = ResultStore.create(store_path, ["x2", "y2", "theta2", "gamma"], ["v", "w"])
+            
+            store.write(time_axis, states, inputs)
+            
+            store.close()
+        
+        if kind == "csv_write":
+            return write_csv, num_bytes / 1e6
+        
+        if kind == "csv_read":
+            
+            write_csv()
+            
+            return lambda: load_csv_columns(csv_path, ["t", "x2", "y2", "theta2", "gamma", "v", "w"]), num_bytes / 1e6
+        
+        if kind == "store_write":
+            return write_store, num_bytes / 1e6
+        
+        write_store()
+        
+        def read_store():
+            
+            # Copying every memory-mapped column forces the data to be read, opening the store only loads the metadata
+            return np.vstack([np.asarray(column) for column in ResultStore.open(store_path).columns().values()])
+        
+        return read_store, num_bytes / 1e6
+    
+    return Benchmark(f"io/{kind}", "MB/s", setup)
+
+def default_benchmarks():
+    
+    benchmarks = [simulate_benchmark(horizon, method, num_states) for horizon in HORIZONS for method in METHODS for num_states in NUM_STATES]
+    
+    benchmarks += [model_step_benchmark(method, num_states) for method in METHODS for num_states in NUM_STATES]
+    
+    benchmarks += [graphic_model_benchmark(False), graphic_model_benchmark(True), dynamic_artists_benchmark()]
+    
+    benchmarks += [render_benchmark("small"), render_benchmark("large")]
+    
+    benchmarks += [io_benchmark(kind) for kind in ("csv_write", "csv_read", "store_write", "store_read")]
+    
+    return benchmarks
+
+def measure(benchmark, repeats=5, scale=1):
+    
+    with tempfile.TemporaryDirectory(prefix="benchmark_") as folder:
+        return _measure(benchmark.setup(scale, folder), benchmark.unit, repeats)
+
+def _measure(setup_result, unit, repeats):
+    
+    function, work = setup_result
+    
+    # Warm up caches and lazily built objects, then keep the best of the timed repeats
+    function()
+    
+    times = []
+    
+    for _ in range(repeats):
+        
+        start = time.perf_counter()
+        
+        function()
+        
+        times.append(time.perf_counter() - start)
+    
+    # Peak memory is measured in a separate run, tracing allocations slows the code down
+    tracemalloc.start()
+    
+    function()
+    
+    _, peak_memory = tracemalloc.get_traced_memory()
+    
+    tracemalloc.stop()
+    
+    return {"unit": unit, "throughput": work / min(times), "best_time": min(times), "median_time": float(np.median(times)),
+            "peak_memory": peak_memory, "repeats": repeats}
+
+def environment_metadata():
+    
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=PACKAGE_PATH, capture_output=True, text=True, check=True).stdout.strip()
+        
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    
+    return {"commit": commit, "python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform(),
+            "processor": platform.processor(), "cpu_count": os.cpu_count(), "date": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+def run(benchmarks, repeats=5, scale=1):
+    
+    results = {}
+    
+    for benchmark in benchmarks:
+        
+        results[benchmark.name] = measure(benchmark, repeats, scale)
+        
+        print(f"[Benchmark][Info] {benchmark.name:32s} {results[benchmark.name]['throughput']:14.1f} {benchmark.unit:9s} "
+              f"peak memory {results[benchmark.name]['peak_memory'] / 1e6:8.2f} MB")
+    
+    return {"metadata": dict(environment_metadata(), repeats=repeats, scale=scale), "results": results}
+
+def parse_args():
+    
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and save the results as JSON")
+    
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file the results are written to")
+    
+    parser.add_argument("--filter", default=None, help="Regular expression, only benchmarks with a matching name are run")
+    
+    parser.add_argument("--repeats", type=int, default=5, help="Number of timed repeats of every benchmark")
+    
+    parser.add_argument("--quick", action="store_true", help=f"Shrink every workload {QUICK_FACTOR} times")
+    
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    
+    benchmarks = [benchmark for benchmark in default_benchmarks() if args.filter is None or re.search(args.filter, benchmark.name)]
+    
+    if len(benchmarks) == 0:
+        raise Exception(f"Failed to run benchmarks. No benchmark matches '{args.filter}'")
+    
+    report = run(benchmarks, args.repeats, QUICK_FACTOR if args.quick else 1)
+    
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    
+    print(f"[Benchmark][Info] Saved results to {args.output}")
@@ -0,0 +1,161 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+File: scenarios.py
+
+Description:
+    This script defines the reproducible workloads of the benchmark suite: tractor-trailer models with 4 or 6 states,
+    seeded input sequences of short and long horizons, and small or large environments.
+
+Author:
+    Loc Dang 
+
+Contact:
+    bobdbl99@gmail.com
+    
+Date:
+    October 17, 2026
+
+License:
+    BSD 3-Clause License
+
+    Redistribution and use in source and binary forms, with or without modification,
+    are permitted provided that the following conditions are met:
+
+    1. Redistributions of source code must retain the above copyright notice, this
+       list of conditions and the following disclaimer.
+
+    2. Redistributions in binary form must reproduce the above copyright notice, this
+       list of conditions and the following disclaimer in the documentation and/or
+       other materials provided with the distribution.
+
+    3. Neither the name of the copyright holder nor the names of its contributors
+       may be used to endorse or promote products derived from this software without
+       specific prior written permission.
+
+    THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+    IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+    INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT
+    NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+    PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+    WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+    ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY
+    OF SUCH DAMAGE.
+"""
+
+import os
+import copy
+import yaml
+import numpy as np
+
+from models.tractor_trailer_model import TractorTrailerModel
+from simple_dynamics_simulator.graphic.scene import Scene
+
+PACKAGE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Number of simulated steps of each horizon
+HORIZONS = {"short": 200, "long": 20000}
+
+METHODS = ("KR1", "KR4")
+
+NUM_STATES = (4, 6)
+
+# The small environment is config/environment.yaml, the large one is generated with this many obstacles
+LARGE_ENVIRONMENT_SIZE = 10000
+
+SEED = 0
+
+
+def load_model_params(num_states=4, discrete_method="KR1"):
+    
+    with open(os.path.join(PACKAGE_PATH, "config", "params.yaml"), "r") as file:
+        params = yaml.safe_load(file)
+    
+    model_params = copy.deepcopy(params["model_params"])
+    
+    model_params["standard_params"]["num_states"] = num_states
+    
+    model_params["standard_params"]["discrete_method"] = discrete_method
+    
+    return model_params
+
+def load_animator_params():
+    
+    with open(os.path.join(PACKAGE_PATH, "config", "params.yaml"), "r") as file:
+        params = yaml.safe_load(file)
+    
+    return params["animator_params"]
+
+def make_model(num_states=4, discrete_method="KR1"):
+    
+    return TractorTrailerModel(load_model_params(num_states, discrete_method))
+
+def make_initial_state(num_states=4):
+    
+    # Trailer at the origin. The 6-state model also carries the tractor pose in front of it
+    if num_states == 6:
+        
+        model_params = load_model_params()["additional_params"]
+        
+        return np.array([model_params["length_front"] + model_params["length_back"], 0., 0., 0., 0., 0.])
+    
+    return np.zeros(num_states)
+
+def make_inputs(steps, seed=SEED):
+    
+    # Forward speed with small noise and a slowly varying steering rate, so that the robot keeps turning
+    rng = np.random.default_rng(seed)
+    
+    time_axis = np.arange(steps)
+    
+    speed = 0.5 + 0.05 * rng.standard_normal(steps)
+    
+    steering = 0.3 * np.sin(2 * np.pi * time_axis / 500) + 0.05 * rng.standard_normal(steps)
+    
+    return np.vstack((speed, steering))
+
+def make_states(steps, seed=SEED):
+    
+    # A 4-state trajectory for the graphic benchmarks
+    model = make_model()
+    
+    states = np.zeros((4, steps))
+    
+    inputs = make_inputs(steps - 1, seed)
+    
+    for i in range(steps - 1):
+        states[:, i + 1] = model.step(states[:, i], inputs[:, i])
+    
+    return states
+
+def make_environment(size, seed=SEED):
+    
+    if size == "small":
+        return Scene.from_yaml(os.path.join(PACKAGE_PATH, "config", "environment.yaml"))
+    
+    if size != "large":
+        raise Exception(f"Failed to make environment. The size is expected to be 'small' or 'large', got '{size}'")
+    
+    # Circles, rectangles and hexagons spread over the plotted area
+    rng = np.random.default_rng(seed)
+    
+    num_objects = LARGE_ENVIRONMENT_SIZE // 3
+    
+    object_list = []
+    
+    for index, center in enumerate(rng.uniform((-2., -1.), (8., 7.), (num_objects, 2))):
+        object_list.append({"name": f"circle_{index}", "type": "circle", "center": center.tolist(), "radius": 0.02, "params": {"color": "grey"}})
+    
+    for index, center in enumerate(rng.uniform((-2., -1.), (8., 7.), (num_objects, 2))):
+        object_list.append({"name": f"rectangle_{index}", "type": "rectangle", "center": center.tolist(), "width": 0.04, "height": 0.02,
+                            "rotate_angle": float(rng.uniform(-np.pi, np.pi)), "params": {"color": "grey"}})
+    
+    hexagon = 0.03 * np.stack((np.cos(np.arange(6) * np.pi / 3), np.sin(np.arange(6) * np.pi / 3)), axis=1)
+    
+    for index, center in enumerate(rng.uniform((-2., -1.), (8., 7.), (LARGE_ENVIRONMENT_SIZE - 2 * num_objects, 2))):
+        object_list.append({"name": f"polygon_{index}", "type": "polygon", "vertices": (center + hexagon).tolist(), "params": {"color": "grey"}})
+    
+    return Scene.from_object_list(object_list)
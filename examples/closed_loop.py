@@ -0,0 +1,141 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+File: closed_loop.py
+
+Description:
+    This script simulates the tractor-trailer model in closed loop with a simple tracking controller that follows
+    the reference path. The controller is a CasADi function, so the controller and the model are compiled into one
+    native function over the whole horizon. With --python, the same controller is called from Python every control
+    period instead, which is useful for comparing the run times.
+
+Author:
+    Loc Dang 
+
+Contact:
+    bobdbl99@gmail.com
+    
+Date:
+    October 17, 2026
+
+License:
+    BSD 3-Clause License
+
+    Redistribution and use in source and binary forms, with or without modification,
+    are permitted provided that the following conditions are met:
+
+    1. Redistributions of source code must retain the above copyright notice, this
+       list of conditions and the following disclaimer.
+
+    2. Redistributions in binary form must reproduce the above copyright notice, this
+       list of conditions and the following disclaimer in the documentation and/or
+       other materials provided with the distribution.
+
+    3. Neither the name of the copyright holder nor the names of its contributors
+       may be used to endorse or promote products derived from this software without
+       specific prior written permission.
+
+    THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+    IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+    INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT
+    NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+    PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+    WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+    ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY
+    OF SUCH DAMAGE.
+"""
+import sys
+import os 
+import time
+import argparse
+import casadi.casadi as cs
+import numpy as np
+
+PACKAGE_PATH = os.path.join(os.path.dirname(__file__), '..')
+sys.path.append(os.path.abspath(PACKAGE_PATH))
+
+from main import load_params, load_reference_path
+from models.tractor_trailer_model import TractorTrailerModel
+from simple_dynamics_simulator.simulator import Simulator
+
+def make_reference(reference_path, steps, step_size, lookahead):
+    
+    # The target moves along the path with constant speed, so that it reaches the end of the path at 90% of the horizon.
+    # Column k is the target at step k, lookahead meters ahead of the nominal position
+    arc_length = np.concatenate(([0.], np.cumsum(np.linalg.norm(np.diff(reference_path, axis=1), axis=0))))
+    
+    speed = arc_length[-1] / (0.9 * steps * step_size)
+    
+    target_length = np.minimum(speed * step_size * np.arange(steps) + lookahead, arc_length[-1])
+    
+    return np.vstack((np.interp(target_length, arc_length, reference_path[0]), np.interp(target_length, arc_length, reference_path[1])))
+
+def make_controller(model, speed_gain=0.8, steering_gain=1.5, max_speed=1., max_steering=1.):
+    
+    # Steers the tractor towards the target and slows down when the target is close or behind
+    state = cs.SX.sym("state", model._nx)
+    
+    reference = cs.SX.sym("reference", 2)
+    
+    current_time = cs.SX.sym("time")
+    
+    x1, y1, theta1 = model._compute_tractor_pose(cs.vertsplit(state))
+    
+    dx, dy = reference[0] - x1, reference[1] - y1
+    
+    heading_error = cs.atan2(cs.sin(cs.atan2(dy, dx) - theta1), cs.cos(cs.atan2(dy, dx) - theta1))
+    
+    speed = cs.fmin(cs.fmax(speed_gain * cs.sqrt(dx**2 + dy**2) * cs.cos(heading_error), 0.), max_speed)
+    
+    steering = cs.fmin(cs.fmax(steering_gain * heading_error, -max_steering), max_steering)
+    
+    return cs.Function("tracking_controller", [state, reference, current_time], [cs.vertcat(speed, steering)], ["state", "reference", "time"], ["input"])
+
+def parse_args():
+    
+    parser = argparse.ArgumentParser(description="Simulate the tractor-trailer model with a path tracking controller")
+    
+    parser.add_argument("--steps", type=int, default=300, help="Number of simulated steps")
+    
+    parser.add_argument("--control-period", type=float, default=None, help="Period of the controller in seconds, a multiple of the step size")
+    
+    parser.add_argument("--lookahead", type=float, default=0.5, help="Distance of the target ahead of the nominal position on the path")
+    
+    parser.add_argument("--python", action="store_true", help="Call the controller from Python instead of compiling the closed loop")
+    
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    
+    common_params, model_params, _ = load_params("params.yaml")
+    
+    reference_path = load_reference_path(common_params)
+    
+    model = TractorTrailerModel(model_params)
+    
+    simulator = Simulator(model)
+    
+    reference = make_reference(reference_path, args.steps, model._step_size, args.lookahead)
+    
+    controller = make_controller(model)
+    
+    if args.python:
+        controller = lambda state, reference, current_time, function=controller: function(state, reference, current_time).full().ravel()
+    
+    start = time.perf_counter()
+    
+    time_axis, states, inputs = simulator.run_closed_loop(np.array(common_params["initial_state"]), controller, reference,
+                                                          control_period=args.control_period)
+    
+    print(f"Simulated {args.steps} steps in {time.perf_counter() - start:.4f}s")
+    
+    # Distance of the tractor to the closest point of the reference path
+    tractor_pose = model._compute_tractor_pose(states)
+    
+    distances = np.min(np.linalg.norm(tractor_pose[0:2, :, np.newaxis] - reference_path[:, np.newaxis, :], axis=0), axis=1)
+    
+    print(f"Tracking error: mean {distances.mean():.3f}m, max {distances.max():.3f}m, final position ({tractor_pose[0, -1]:.2f}, {tractor_pose[1, -1]:.2f})")
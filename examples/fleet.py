@@ -0,0 +1,126 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+File: fleet.py
+
+Description:
+    This script simulates a fleet of tractor-trailers with different lengths in one shared yard and animates all of them in one view.
+
+Author:
+    Loc Dang 
+
+Contact:
+    bobdbl99@gmail.com
+    
+Date:
+    October 17, 2026
+
+License:
+    BSD 3-Clause License
+
+    Redistribution and use in source and binary forms, with or without modification,
+    are permitted provided that the following conditions are met:
+
+    1. Redistributions of source code must retain the above copyright notice, this
+       list of conditions and the following disclaimer.
+
+    2. Redistributions in binary form must reproduce the above copyright notice, this
+       list of conditions and the following disclaimer in the documentation and/or
+       other materials provided with the distribution.
+
+    3. Neither the name of the copyright holder nor the names of its contributors
+       may be used to endorse or promote products derived from this software without
+       specific prior written permission.
+
+    THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+    IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+    INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT
+    NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+    PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+    WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+    ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY
+    OF SUCH DAMAGE.
+"""
+import sys
+import os 
+import time
+import argparse
+import numpy as np
+
+PACKAGE_PATH = os.path.join(os.path.dirname(__file__), '..')
+sys.path.append(os.path.abspath(PACKAGE_PATH))
+
+from main import load_params, load_environment
+from models.tractor_trailer_model import TractorTrailerModel
+from simple_dynamics_simulator.multi_agent import MultiAgentSimulator
+from simple_dynamics_simulator.graphic.animator import Animator
+
+def make_fleet(animator_params, num_agents, rng):
+    
+    # Agents start spread over the view with random headings, and lengths around those of config/params.yaml
+    intial_states = np.zeros((4, num_agents))
+    
+    intial_states[0] = rng.uniform(animator_params["xlim_lb"], animator_params["xlim_ub"], num_agents)
+    
+    intial_states[1] = rng.uniform(animator_params["ylim_lb"], animator_params["ylim_ub"], num_agents)
+    
+    intial_states[2] = rng.uniform(-np.pi, np.pi, num_agents)
+    
+    agent_params = {"length_back": rng.uniform(0.2, 0.4, num_agents), "length_front": rng.uniform(0.6, 1.2, num_agents)}
+    
+    return intial_states, agent_params
+
+def make_inputs(steps, num_agents, rng):
+    
+    # Constant speed per agent and a slowly varying steering rate
+    speed = np.broadcast_to(rng.uniform(0.2, 0.6, num_agents), (steps, num_agents))
+    
+    steering = 0.3 * np.sin(np.linspace(0, 4 * np.pi, steps)[:, np.newaxis] + rng.uniform(0, 2 * np.pi, num_agents))
+    
+    return np.stack((speed, steering), axis=1)
+
+def parse_args():
+    
+    parser = argparse.ArgumentParser(description="Simulate and animate a fleet of tractor-trailers")
+    
+    parser.add_argument("--agents", type=int, default=500, help="Number of vehicles")
+    
+    parser.add_argument("--steps", type=int, default=200, help="Number of simulated steps")
+    
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random fleet")
+    
+    parser.add_argument("--no-animation", action="store_true", help="Only simulate and report the time per tick")
+    
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    
+    common_params, model_params, animator_params = load_params("params.yaml")
+    
+    environment = load_environment("environment.yaml")
+    
+    rng = np.random.default_rng(args.seed)
+    
+    intial_states, agent_params = make_fleet(animator_params, args.agents, rng)
+    
+    simulator = MultiAgentSimulator(TractorTrailerModel, model_params, args.agents, agent_params)
+    
+    inputs = make_inputs(args.steps, args.agents, rng)
+    
+    start = time.perf_counter()
+    
+    time_axis, states, applied_input = simulator.run(intial_states, inputs)
+    
+    elapsed = time.perf_counter() - start
+    
+    print(f"Simulated {args.agents} agents for {args.steps} steps in {elapsed:.4f}s ({elapsed / args.steps * 1e6:.1f}us per tick)")
+    
+    if not args.no_animation:
+        
+        animator = Animator(animator_params, simulator.model)
+        
+        animator.run_fleet(states, environment=environment)
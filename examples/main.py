@@ -46,6 +46,7 @@ License:
 """
 import sys
 import os 
+import argparse
 import yaml
 import csv
 import numpy as np
@@ -55,8 +56,12 @@ sys.path.append(os.path.abspath(PACKAGE_PATH))
 
 from models.tractor_trailer_model import TractorTrailerModel
 from simple_dynamics_simulator.simulator import Simulator
+from simple_dynamics_simulator.collision import CollisionChecker
+from simple_dynamics_simulator.cache import ResultCache
+from simple_dynamics_simulator.data_loader import load_csv_columns
 from simple_dynamics_simulator.graphic.animator import Animator
-from simple_dynamics_simulator.graphic.graphic_object import Rectangle, Circle, Polygon
+from simple_dynamics_simulator.graphic.scene import Scene
+from simple_dynamics_simulator.result_store import ResultStore
 
 def load_params(file_name, config_path=None):
     
@@ -80,38 +85,13 @@ def load_environment(file_name, config_path=None):
     if config_path == None: 
         config_path = os.path.join(PACKAGE_PATH, "config")
 
-    object_list = read_yaml(os.path.join(config_path, file_name)) 
-    
-    environemnt = generate_graphic_objects(object_list)
+    # Obstacles are stored in typed arrays, which keeps large environments cheap to load and draw
+    environemnt = Scene.from_yaml(os.path.join(config_path, file_name))
     
     print("Successfully loaded environment")
     
     return environemnt
 
-def generate_graphic_objects(object_list):
-    
-    graphic_objects = []
-    
-    for object_list in object_list:
-        
-        object_type = object_list["type"]
-        
-        if object_type == "rectangle":
-            object = Rectangle(object_list["name"], object_list["center"], object_list["width"], object_list["height"], object_list["rotate_angle"], object_list["params"])
-        
-        elif object_type == "circle":
-            object = Circle(object_list["name"], object_list["center"], object_list["radius"], object_list["params"])
-        
-        elif object_type == "polygon":
-            object = Polygon(object_list["name"], object_list["vertices"], object_list["params"])
-        
-        else:
-            raise Exception("Failed to generate graphic object. The object type is not supported. Please use 'rectangle', 'circle', or 'polygon'")
-        
-        graphic_objects.append(object)
-            
-    return graphic_objects
-    
 def read_yaml(file_path):
     
     with open(file_path, "r") as file:
@@ -119,24 +99,6 @@ def read_yaml(file_path):
     
     return data
 
-def read_csv(file_path):
-
-    with open(file_path, newline='') as csvfile:
-            
-        csvreader = csv.reader(csvfile)
-        
-        headers = next(csvreader)
-        
-        data = {header: [] for header in headers}
-        
-        for row in csvreader:
-            
-            for header, value in zip(headers, row):
-                
-                data[header].append(float(value))
-    
-    return data
-
 def write_csv(data, file_path):
     
     headers = data.keys()
@@ -153,38 +115,42 @@ def write_csv(data, file_path):
 
 def load_reference_path(common_params):
     
-    reference_path_data = read_csv(os.path.join(PACKAGE_PATH, common_params["data_folder"], common_params["reference_path_filename"]))
-    
-    reference_path = np.zeros((len(common_params["reference_path_names"]), len(reference_path_data[common_params["reference_path_names"][0]])))
-
-    for i, state_name in enumerate(common_params["reference_path_names"]):
-        reference_path[i] = np.array(reference_path_data[state_name])
+    reference_path = load_csv_columns(os.path.join(PACKAGE_PATH, common_params["data_folder"], common_params["reference_path_filename"]),
+                                      common_params["reference_path_names"])
     
     print("Successfully loaded reference path")
 
     return reference_path
 
 def load_system_input(common_params):
-    system_input_data = read_csv(os.path.join(PACKAGE_PATH, common_params["data_folder"], common_params["system_input_filename"]))
     
-    system_input = np.zeros((len(common_params["system_input_names"]), len(system_input_data[common_params["system_input_names"][0]])))
-
-    for i, input_name in enumerate(common_params["system_input_names"]):
-        system_input[i] = np.array(system_input_data[input_name])
+    system_input = load_csv_columns(os.path.join(PACKAGE_PATH, common_params["data_folder"], common_params["system_input_filename"]),
+                                    common_params["system_input_names"])
     
     print("Successfully loaded system input")
         
     return system_input
 
 def compute_tractor_state(states):
-    tractor_state = np.zeros((3, states.shape[1]))
     
-    for  index in range(states.shape[1]):
-        tractor_state[:, index] =  model._compute_tractor_pose(states[:, index])
+    # The tractor pose is computed for all columns at once
+    return model._compute_tractor_pose(states)
+
+def parse_args():
+    
+    parser = argparse.ArgumentParser(description="Simulate and animate the tractor-trailer model")
+    
+    parser.add_argument("--export", default=None, help="Render the animation offscreen to a .mp4, a .gif or a folder of PNG frames instead of showing it")
+    
+    parser.add_argument("--cache-dir", default=None, help="Folder of the result cache. Repeated runs of the same scenario are read from it")
     
-    return tractor_state
+    parser.add_argument("--workers", type=int, default=None, help="Number of processes used to render frames for --export (default: number of cores)")
+    
+    return parser.parse_args()
 
 if __name__ == "__main__":
+    args = parse_args()
+    
     # Read params and data
     common_params, model_params, animator_params = load_params("params.yaml")
     
@@ -197,14 +163,20 @@ if __name__ == "__main__":
     # Initialize
     model = TractorTrailerModel(model_params)
 
-    simulator = Simulator(model)
+    simulator = Simulator(model, cache=ResultCache(args.cache_dir) if args.cache_dir is not None else None)
     
-    animator = Animator(animator_params, model)
+    animator = Animator(animator_params, model, headless=args.export is not None)
     
     # Simulation
     intial_state = np.array(common_params["initial_state"])
     
-    time_axis, states, _ = simulator.run(intial_state, control_input)
+    time_axis, states, applied_input = simulator.run(intial_state, control_input)
+    
+    # Collision check of the tractor and trailer footprints against the environment
+    collision = CollisionChecker(environment).check_trajectory(model, states)
+    
+    if collision.collided:
+        print(f"Collision detected at t = {time_axis[collision.first_collision]:.2f}s ({collision.flags.sum()} colliding steps)")
     
     # Animation
     static_paths = {"Reference path": reference_path}
@@ -215,12 +187,23 @@ if __name__ == "__main__":
                     "Tractor trajectory": np.array([tractor_state[0], tractor_state[1]]),
                     }
     
-    animator.run(
-        states,
-        static_paths=static_paths,
-        dynamic_paths=dynamic_paths,
-        environment=environment
-        )
+    if args.export is not None:
+        animator.export(
+            args.export,
+            states,
+            static_paths=static_paths,
+            dynamic_paths=dynamic_paths,
+            environment=environment,
+            workers=args.workers
+            )
+        
+    else:
+        animator.run(
+            states,
+            static_paths=static_paths,
+            dynamic_paths=dynamic_paths,
+            environment=environment
+            )
     
     # Export data
     output_data = {
@@ -240,4 +223,14 @@ if __name__ == "__main__":
     
     file_path = os.path.join(PACKAGE_PATH, common_params["data_folder"], common_params["output_filename"])
     
-    write_csv(output_data, file_path)
\ No newline at end of file
+    write_csv(output_data, file_path)
+    
+    # Binary copy of the full result, readable column by column with np.memmap through ResultStore.open
+    store = ResultStore.create(os.path.join(PACKAGE_PATH, common_params["data_folder"], common_params["output_store_name"]),
+                               ["x2", "y2", "theta2", "gamma"], common_params["system_input_names"],
+                               derived=model._compute_tractor_pose, derived_names=["x1", "y1", "theta1"],
+                               metadata=ResultStore.simulation_metadata(model))
+    
+    store.write(time_axis, states, applied_input)
+    
+    store.close()
\ No newline at end of file
@@ -0,0 +1,142 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+File: realtime.py
+
+Description:
+    This script runs the tractor-trailer model on a RealTimeServer, or connects to one as a client.
+    
+    Usage:
+        python ./examples/realtime.py serve --port 8765 --speed-factor 5
+        python ./examples/realtime.py drive --port 8765
+    
+    The client replays the inputs of system_input.csv, one per received state, and prints the states and the
+    server metrics.
+
+Author:
+    Loc Dang 
+
+Contact:
+    bobdbl99@gmail.com
+    
+Date:
+    October 17, 2026
+
+License:
+    BSD 3-Clause License
+
+    Redistribution and use in source and binary forms, with or without modification,
+    are permitted provided that the following conditions are met:
+
+    1. Redistributions of source code must retain the above copyright notice, this
+       list of conditions and the following disclaimer.
+
+    2. Redistributions in binary form must reproduce the above copyright notice, this
+       list of conditions and the following disclaimer in the documentation and/or
+       other materials provided with the distribution.
+
+    3. Neither the name of the copyright holder nor the names of its contributors
+       may be used to endorse or promote products derived from this software without
+       specific prior written permission.
+
+    THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+    IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+    INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT
+    NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+    PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+    WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+    ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY
+    OF SUCH DAMAGE.
+"""
+import sys
+import os 
+import json
+import asyncio
+import argparse
+import numpy as np
+
+PACKAGE_PATH = os.path.join(os.path.dirname(__file__), '..')
+sys.path.append(os.path.abspath(PACKAGE_PATH))
+
+from main import load_params, load_system_input
+from models.tractor_trailer_model import TractorTrailerModel
+from simple_dynamics_simulator.realtime import RealTimeServer
+
+async def serve(args):
+    
+    common_params, model_params, animator_params = load_params("params.yaml")
+    
+    server = RealTimeServer(TractorTrailerModel(model_params), np.array(common_params["initial_state"]),
+                            speed_factor=args.speed_factor or animator_params["speed_factor"])
+    
+    await server.start(port=args.port, path=args.unix)
+    
+    try:
+        await server.run(args.steps)
+        
+    finally:
+        print(f"[RealTimeServer][Info] {json.dumps(server.metrics())}")
+        
+        await server.close()
+
+async def drive(args):
+    
+    common_params, _, _ = load_params("params.yaml")
+    
+    control_input = load_system_input(common_params)
+    
+    if args.unix is not None:
+        reader, writer = await asyncio.open_unix_connection(args.unix)
+        
+    else:
+        reader, writer = await asyncio.open_connection("127.0.0.1", args.port)
+    
+    for i in range(control_input.shape[1]):
+        
+        writer.write((json.dumps({"type": "input", "input": control_input[:, i].tolist()}) + "\n").encode())
+        
+        await writer.drain()
+        
+        message = json.loads(await reader.readline())
+        
+        if message["type"] == "state":
+            print(f"t = {message['time']:7.2f}s  state = {np.array2string(np.array(message['state']), precision=3)}")
+    
+    writer.write(b'{"type": "metrics"}\n')
+    
+    await writer.drain()
+    
+    # State messages published before the reply are skipped
+    while (message := json.loads(await reader.readline()))["type"] != "metrics":
+        pass
+    
+    print(json.dumps(message, indent=2))
+    
+    writer.close()
+
+def parse_args():
+    
+    parser = argparse.ArgumentParser(description="Real-time tractor-trailer simulation over a socket")
+    
+    parser.add_argument("mode", choices=["serve", "drive"], help="Run the server or a client that drives it")
+    
+    parser.add_argument("--port", type=int, default=None, help="TCP port on 127.0.0.1")
+    
+    parser.add_argument("--unix", default=None, help="UNIX socket path")
+    
+    parser.add_argument("--speed-factor", type=float, default=None, help="Multiple of real time (default: speed_factor of animator_params)")
+    
+    parser.add_argument("--steps", type=int, default=None, help="Stop the server after this many steps")
+    
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    
+    if args.port is None and args.unix is None:
+        args.port = 8765
+    
+    asyncio.run(serve(args) if args.mode == "serve" else drive(args))
@@ -0,0 +1,122 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+File: sweep.py
+
+Description:
+    This script runs a parameter sweep of the tractor-trailer model over a grid or a list of parameter overrides.
+    
+    Usage:
+        python ./examples/sweep.py --grid length_back=0.2,0.23,0.3 --grid discrete_method=KR1,KR4
+        python ./examples/sweep.py --points config/sweep_points.yaml --output-dir data/sweep
+
+Author:
+    Loc Dang 
+
+Contact:
+    bobdbl99@gmail.com
+    
+Date:
+    October 17, 2026
+
+License:
+    BSD 3-Clause License
+
+    Redistribution and use in source and binary forms, with or without modification,
+    are permitted provided that the following conditions are met:
+
+    1. Redistributions of source code must retain the above copyright notice, this
+       list of conditions and the following disclaimer.
+
+    2. Redistributions in binary form must reproduce the above copyright notice, this
+       list of conditions and the following disclaimer in the documentation and/or
+       other materials provided with the distribution.
+
+    3. Neither the name of the copyright holder nor the names of its contributors
+       may be used to endorse or promote products derived from this software without
+       specific prior written permission.
+
+    THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+    IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+    INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT
+    NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+    PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+    WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+    ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY
+    OF SUCH DAMAGE.
+"""
+import sys
+import os 
+import argparse
+import yaml
+import numpy as np
+
+PACKAGE_PATH = os.path.join(os.path.dirname(__file__), '..')
+sys.path.append(os.path.abspath(PACKAGE_PATH))
+
+from main import load_params, load_system_input, read_yaml
+from models.tractor_trailer_model import TractorTrailerModel
+from simple_dynamics_simulator.sweep import ParameterSweep, expand_grid
+from simple_dynamics_simulator.events import jackknife_event
+
+def parse_grid(grid_args):
+    
+    grid = {}
+    
+    for grid_arg in grid_args:
+        
+        name, values = grid_arg.split("=", 1)
+        
+        grid[name] = [yaml.safe_load(value) for value in values.split(",")]
+    
+    return grid
+
+def parse_args():
+    
+    parser = argparse.ArgumentParser(description="Simulate the tractor-trailer model for every point of a parameter sweep")
+    
+    parser.add_argument("--grid", action="append", default=[], help="name=v1,v2,... Every combination of the given values is simulated")
+    
+    parser.add_argument("--points", default=None, help="YAML file containing a list of parameter overrides")
+    
+    parser.add_argument("--params", default="params.yaml", help="Parameter file inside the config folder")
+    
+    parser.add_argument("--output-dir", default=None, help="Folder for the memory-mapped results. An interrupted sweep resumes from it")
+    
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: number of cores)")
+    
+    parser.add_argument("--max-hitch-angle", type=float, default=None, help="Stop a point once the absolute hitch angle exceeds this value (rad)")
+    
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    
+    common_params, model_params, _ = load_params(args.params)
+    
+    control_input = load_system_input(common_params)
+    
+    points = read_yaml(args.points) if args.points is not None else []
+    
+    if len(args.grid) > 0:
+        points += expand_grid(parse_grid(args.grid))
+    
+    if len(points) == 0:
+        raise Exception("Failed to run sweep. Please provide sweep points with --grid or --points")
+    
+    events = [jackknife_event(args.max_hitch_angle)] if args.max_hitch_angle is not None else None
+    
+    sweep = ParameterSweep(TractorTrailerModel, model_params, np.array(common_params["initial_state"]), control_input, points,
+                           output_dir=args.output_dir, max_workers=args.workers, events=events)
+    
+    for index, point, time_axis, states, terminal_event in sweep.iter_run():
+        
+        # Columns after a terminal event are NaN
+        last = np.flatnonzero(~np.isnan(states[0]))[-1]
+        
+        stopped = f" (stopped by {terminal_event.name})" if terminal_event is not None else ""
+        
+        print(f"[{index + 1}/{len(points)}] {point} -> final state {np.array2string(states[:, last], precision=4)} at t = {time_axis[last]:.2f}{stopped}")
@@ -46,16 +46,11 @@ License:
     OF SUCH DAMAGE.
 """
 
-import sys
-import os 
 import math
-from copy import deepcopy
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-import casadi.casadi as cs
 import numpy as np
+from simple_dynamics_simulator.backend import get_backend
 from simple_dynamics_simulator.model import Model
-from simple_dynamics_simulator.graphic.graphic_object import Rectangle, Circle
+from simple_dynamics_simulator.graphic.graphic_object import Rectangle, Circle, GraphicModelBatch, GRAPHIC_POSE_DTYPE
 
 
 class TractorTrailerModel(Model):
@@ -68,19 +63,32 @@ class TractorTrailerModel(Model):
         
         additional_params = params["additional_params"]
         
+        self._additional_params = additional_params
+        
         self._lb = additional_params["length_back"]
         
         self._lf = additional_params["length_front"]
         
         
+    def metadata(self):
+        
+        metadata = super().metadata()
+        
+        metadata["additional_params"] = self._additional_params
+        
+        return metadata
+        
     def dynamics(self, state, input):
         
         if len(state) != self._nx or len(input) != self._nu:
             raise Exception("Failed to compute dynamics. The size of input arguments is not matched with the size of state or control input")
         
-        v1, w1 = input
+        backend = get_backend(state)
+        
+        if backend is math:
+            state, input = np.asarray(state, dtype=float).tolist(), np.asarray(input, dtype=float).tolist()
         
-        state_dot = []
+        v1, w1 = input
         
         if self._nx == 6:
             
@@ -88,49 +96,68 @@ class TractorTrailerModel(Model):
             
             gamma = theta2 - theta1
             
-            x1_dot = v1 * cs.cos(theta1)
-            
-            y1_dot = v1 * cs.sin(theta1)
-            
-            theta1_dot = w1 
+        elif self._nx == 4:
             
-            x2_dot = v1 * cs.cos(theta2) * cs.cos(gamma) - w1 * self._lb * cs.cos(theta2) * cs.sin(gamma)
+            x2 , y2 , theta2, gamma =  state
             
-            y2_dot = v1 * cs.sin(theta2) * cs.cos(gamma) - w1 * self._lb * cs.sin(theta2) * cs.sin(gamma)
+        else:
+            raise Exception(f"Failed to compute dynamics. The number of states is expected to be 4 or 6, got {self._nx}")
+        
+        cos_theta2, sin_theta2 = backend.cos(theta2), backend.sin(theta2)
+        
+        cos_gamma, sin_gamma = backend.cos(gamma), backend.sin(gamma)
+        
+        x2_dot = cos_theta2 * (v1 * cos_gamma - w1 * self._lb * sin_gamma)
+        
+        y2_dot = sin_theta2 * (v1 * cos_gamma - w1 * self._lb * sin_gamma)
+        
+        theta2_dot = - v1 * (1 / self._lf) * sin_gamma - w1 * (self._lb / self._lf) * cos_gamma
+        
+        if self._nx == 6:
             
-            theta2_dot = - v1 * (1 / self._lf) * cs.sin(gamma) - w1 * (self._lb / self._lf) * cs.cos(gamma)      
+            x1_dot = v1 * backend.cos(theta1)
             
-            state_dot = [x1_dot, y1_dot, theta1_dot, x2_dot, y2_dot, theta2_dot]         
+            y1_dot = v1 * backend.sin(theta1)
             
-        elif self._nx == 4:
+            theta1_dot = w1 
             
-            x2 , y2 , theta2, gamma =  state
+            state_dot = (x1_dot, y1_dot, theta1_dot, x2_dot, y2_dot, theta2_dot)
             
-            x2_dot = v1 * cs.cos(theta2) * cs.cos(gamma) - w1 * self._lb * cs.cos(theta2) * cs.sin(gamma)
+        else:
             
-            y2_dot = v1 * cs.sin(theta2) * cs.cos(gamma) - w1 * self._lb * cs.sin(theta2) * cs.sin(gamma)
+            gamma_dot = theta2_dot - w1
             
-            theta2_dot = - v1 * (1 / self._lf) * cs.sin(gamma) - w1 * (self._lb / self._lf) * cs.cos(gamma)
+            state_dot = (x2_dot, y2_dot, theta2_dot, gamma_dot)
+        
+        if backend is np:
             
-            gamma_dot = - v1 * (1 / self._lf) * cs.sin(gamma) - w1 * ((self._lb / self._lf) * cs.cos(gamma) + 1)
+            # Fill a preallocated array instead of stacking a list of rows
+            result = np.empty((self._nx,) + np.shape(x2_dot))
             
-            state_dot = [x2_dot, y2_dot, theta2_dot, gamma_dot]
+            for index, value in enumerate(state_dot):
+                result[index] = value
+                
+            return result
             
-        return  np.asarray(state_dot)
+        return np.asarray(state_dot)
 
     def graphic_model(self, state):
 
-        trailer_pose  = state[0:3]
+        trailer_pose  = np.array(state[0:3], dtype=float)
         
         tractor_pose = self._compute_tractor_pose(state)
         
+        cos_tractor, sin_tractor = math.cos(tractor_pose[2]), math.sin(tractor_pose[2])
+        
+        cos_trailer, sin_trailer = math.cos(trailer_pose[2]), math.sin(trailer_pose[2])
+        
         graphic_model = []
  
         # Tractor       
         tractor = self._graphic_model_params["tractor"]
         
-        translation = [tractor["width"] / 4 * cs.cos(tractor_pose[2]), 
-                       tractor["width"] / 4 * cs.sin(tractor_pose[2])]
+        translation = (tractor["width"] / 4 * cos_tractor, 
+                       tractor["width"] / 4 * sin_tractor)
         
         pose = self._transform_pose(tractor_pose, translation, 0.)
         
@@ -139,8 +166,8 @@ class TractorTrailerModel(Model):
         # Trailer
         trailer = self._graphic_model_params["trailer"]
 
-        translation = [trailer["width"] / 4 * cs.cos(trailer_pose[2]), 
-                       trailer["width"] / 4 * cs.sin(trailer_pose[2])]
+        translation = (trailer["width"] / 4 * cos_trailer, 
+                       trailer["width"] / 4 * sin_trailer)
         
         pose = self._transform_pose(trailer_pose, translation, 0.)  
           
@@ -149,8 +176,8 @@ class TractorTrailerModel(Model):
         # hitch_joint
         hitch_joint  = self._graphic_model_params["hitch_joint"]
         
-        translation = [self._lf  * cs.cos(trailer_pose[2]),  
-                       self._lf  * cs.sin(trailer_pose[2])]
+        translation = (self._lf  * cos_trailer,  
+                       self._lf  * sin_trailer)
         
         pose = self._transform_pose(trailer_pose, translation, 0.) 
                   
@@ -159,11 +186,11 @@ class TractorTrailerModel(Model):
         #front_wheels
         front_wheel = self._graphic_model_params["front_wheels"]
         
-        rw_translation = [(tractor["height"]/2 + front_wheel["height"]/2 + 0.05) * cs.sin(tractor_pose[2]),  
-                          - (tractor["height"]/2 + front_wheel["height"]/2 + 0.05) * cs.cos(tractor_pose[2])]
+        offset = tractor["height"]/2 + front_wheel["height"]/2 + 0.05
+        
+        rw_translation = (offset * sin_tractor, - offset * cos_tractor)
         
-        lw_translation = [-(tractor["height"]/2 + front_wheel["height"]/2 + 0.05) * cs.sin(tractor_pose[2]),  
-                           (tractor["height"]/2 + front_wheel["height"]/2 + 0.05) * cs.cos(tractor_pose[2])]
+        lw_translation = (- offset * sin_tractor, offset * cos_tractor)
         
         rw_pose = self._transform_pose(tractor_pose, rw_translation, 0.) 
         
@@ -176,41 +203,110 @@ class TractorTrailerModel(Model):
         #back_wheels
         back_wheel = self._graphic_model_params["back_wheels"]
         
-        rw_translation = [(trailer["height"]/2 + back_wheel["height"]/2 + 0.05) * cs.sin(trailer_pose[2]),  
-                          - (trailer["height"]/2 + back_wheel["height"]/2 + 0.05) * cs.cos(trailer_pose[2])]
+        offset = trailer["height"]/2 + back_wheel["height"]/2 + 0.05
         
-        lw_translation = [-(trailer["height"]/2 + back_wheel["height"]/2 + 0.05) * cs.sin(trailer_pose[2]),  
-                           (trailer["height"]/2 + back_wheel["height"]/2 + 0.05) * cs.cos(trailer_pose[2])]
+        rw_translation = (offset * sin_trailer, - offset * cos_trailer)
+        
+        lw_translation = (- offset * sin_trailer, offset * cos_trailer)
         
         rw_pose = self._transform_pose(trailer_pose, rw_translation, 0.) 
         
         lw_pose = self._transform_pose(trailer_pose, lw_translation, 0.) 
                  
-        graphic_model.append(Rectangle("front_right_wheel", rw_pose[0:2], back_wheel["width"], back_wheel["height"], rotate_angle=rw_pose[2], params=back_wheel["params"]))
+        graphic_model.append(Rectangle("back_right_wheel", rw_pose[0:2], back_wheel["width"], back_wheel["height"], rotate_angle=rw_pose[2], params=back_wheel["params"]))
         
-        graphic_model.append(Rectangle("front_left_wheel", lw_pose[0:2], back_wheel["width"], back_wheel["height"], rotate_angle=lw_pose[2],  params=back_wheel["params"]))
+        graphic_model.append(Rectangle("back_left_wheel", lw_pose[0:2], back_wheel["width"], back_wheel["height"], rotate_angle=lw_pose[2],  params=back_wheel["params"]))
         
         return graphic_model   
 
+    def graphic_model_batch(self, states):
+        
+        # Same body parts as graphic_model, computed for all columns of states (4, T) at once
+        states = np.asarray(states, dtype=float)
+        
+        trailer_pose = states[0:3]
+        
+        tractor_pose = self._compute_tractor_pose(states)
+        
+        cos_tractor, sin_tractor = np.cos(tractor_pose[2]), np.sin(tractor_pose[2])
+        
+        cos_trailer, sin_trailer = np.cos(trailer_pose[2]), np.sin(trailer_pose[2])
+        
+        tractor = self._graphic_model_params["tractor"]
+        
+        trailer = self._graphic_model_params["trailer"]
+        
+        hitch_joint  = self._graphic_model_params["hitch_joint"]
+        
+        front_wheel = self._graphic_model_params["front_wheels"]
+        
+        back_wheel = self._graphic_model_params["back_wheels"]
+        
+        front_offset = tractor["height"]/2 + front_wheel["height"]/2 + 0.05
+        
+        back_offset = trailer["height"]/2 + back_wheel["height"]/2 + 0.05
+        
+        # (name, type, params, base pose, translation along and across the heading, size)
+        parts = [
+            ("tractor", "rectangle", tractor["params"], tractor_pose, (tractor["width"] / 4, 0.), (tractor["width"], tractor["height"])),
+            ("trailer", "rectangle", trailer["params"], trailer_pose, (trailer["width"] / 4, 0.), (trailer["width"], trailer["height"])),
+            ("hitch_joint", "circle", hitch_joint["params"], trailer_pose, (self._lf, 0.), (hitch_joint["radius"], hitch_joint["radius"])),
+            ("front_right_wheel", "rectangle", front_wheel["params"], tractor_pose, (0., -front_offset), (front_wheel["width"], front_wheel["height"])),
+            ("front_left_wheel", "rectangle", front_wheel["params"], tractor_pose, (0., front_offset), (front_wheel["width"], front_wheel["height"])),
+            ("back_right_wheel", "rectangle", back_wheel["params"], trailer_pose, (0., -back_offset), (back_wheel["width"], back_wheel["height"])),
+            ("back_left_wheel", "rectangle", back_wheel["params"], trailer_pose, (0., back_offset), (back_wheel["width"], back_wheel["height"])),
+        ]
+        
+        poses = np.zeros((len(parts), states.shape[1]), dtype=GRAPHIC_POSE_DTYPE)
+        
+        for index, (_, type, _, base_pose, (forward, left), size) in enumerate(parts):
+            
+            cos_heading, sin_heading = (cos_tractor, sin_tractor) if base_pose is tractor_pose else (cos_trailer, sin_trailer)
+            
+            poses["center"][index, :, 0] = base_pose[0] + forward * cos_heading - left * sin_heading
+            
+            poses["center"][index, :, 1] = base_pose[1] + forward * sin_heading + left * cos_heading
+            
+            if type == "rectangle":
+                poses["angle"][index] = base_pose[2]
+            
+            poses["size"][index] = size
+        
+        return GraphicModelBatch([part[0] for part in parts], [part[1] for part in parts], [part[2] for part in parts], poses)
+
     def _compute_tractor_pose(self, state):
         
         if len(state) != 4:
             raise Exception("Failed to compute tractor pose. The size of state is expected to be equal to 4")
         
+        backend = get_backend(state)
+        
+        if backend is math:
+            state = np.asarray(state, dtype=float).tolist()
+        
         x2, y2, theta2, gamma = state
         
         theta1 = theta2 - gamma
         
-        x1 = x2 + self._lf * cs.cos(theta2) + self._lb * cs.cos(theta1)
+        x1 = x2 + self._lf * backend.cos(theta2) + self._lb * backend.cos(theta1)
+        
+        y1 = y2 + self._lf * backend.sin(theta2) + self._lb * backend.sin(theta1)
         
-        y1 = y2 + self._lf * cs.sin(theta2) + self._lb * cs.sin(theta1)
+        if backend is np:
+            
+            # State matrices (4, T) give one tractor pose per column
+            tractor_pose = np.empty((3,) + np.shape(x1))
+            
+            tractor_pose[0], tractor_pose[1], tractor_pose[2] = x1, y1, theta1
 
+            return tractor_pose
+        
         return np.asarray([x1, y1, theta1])
     
 
     def _transform_pose(self, pose, translation, rotate_angle, degree=False):
         
-        transformed_pose = deepcopy(pose)
+        transformed_pose = np.array(pose)
         
         transformed_pose[0] += translation[0]
         
@@ -221,4 +317,4 @@ class TractorTrailerModel(Model):
             
         transformed_pose[2] += rotate_angle
         
-        return transformed_pose
\ No newline at end of file
+        return transformed_pose
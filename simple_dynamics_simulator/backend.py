@@ -0,0 +1,103 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+File: backend.py
+
+Description:
+    This script defines helpers that select the numeric (NumPy) or symbolic (CasADi) backend for model equations.
+
+Author:
+    Loc Dang 
+
+Contact:
+    bobdbl99@gmail.com
+    
+Date:
+    October 17, 2026
+
+License:
+    BSD 3-Clause License
+
+    Redistribution and use in source and binary forms, with or without modification,
+    are permitted provided that the following conditions are met:
+
+    1. Redistributions of source code must retain the above copyright notice, this
+       list of conditions and the following disclaimer.
+
+    2. Redistributions in binary form must reproduce the above copyright notice, this
+       list of conditions and the following disclaimer in the documentation and/or
+       other materials provided with the distribution.
+
+    3. Neither the name of the copyright holder nor the names of its contributors
+       may be used to endorse or promote products derived from this software without
+       specific prior written permission.
+
+    THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+    IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+    INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT
+    NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+    PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+    WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+    ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY
+    OF SUCH DAMAGE.
+"""
+
+import sys
+import math
+import numpy as np
+
+
+def load_casadi():
+    
+    # CasADi is imported on first use, so numeric simulations never pay for it
+    import casadi.casadi as cs
+    
+    return cs
+
+
+def loaded_casadi():
+    
+    # The CasADi module if it has been imported already, otherwise None. No CasADi value can exist before that
+    return sys.modules.get("casadi.casadi")
+
+
+def is_casadi_function(value):
+    
+    cs = loaded_casadi()
+    
+    return cs is not None and isinstance(value, cs.Function)
+
+
+def is_symbolic(value):
+    
+    cs = loaded_casadi()
+    
+    if cs is None:
+        return False
+    
+    if isinstance(value, (cs.SX, cs.MX)):
+        return True
+    
+    if isinstance(value, np.ndarray):
+        return value.dtype == object and any(is_symbolic(element) for element in value.flat)
+    
+    if isinstance(value, (list, tuple)):
+        return any(is_symbolic(element) for element in value)
+    
+    return False
+
+
+def get_backend(value):
+    
+    # CasADi is only needed to build expressions. Single numeric vectors are cheapest to evaluate as
+    # Python floats with math, while batches of shape (n, N) are evaluated with NumPy ufuncs
+    if is_symbolic(value):
+        return load_casadi()
+    
+    if np.ndim(value) <= 1:
+        return math
+    
+    return np
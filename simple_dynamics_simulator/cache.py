@@ -0,0 +1,187 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+File: cache.py
+
+Description:
+    This script defines the ResultCache class, a content-addressed on-disk cache of simulation results. The key is a
+    SHA-256 hash of the model class and parameters, the integrator, the initial state and the input bytes. Results are
+    written atomically, so several processes can share one cache directory, and the least recently used results are
+    evicted when the directory grows beyond max_bytes.
+
+Author:
+    Loc Dang 
+
+Contact:
+    bobdbl99@gmail.com
+    
+Date:
+    October 17, 2026
+
+License:
+    BSD 3-Clause License
+
+    Redistribution and use in source and binary forms, with or without modification,
+    are permitted provided that the following conditions are met:
+
+    1. Redistributions of source code must retain the above copyright notice, this
+       list of conditions and the following disclaimer.
+
+    2. Redistributions in binary form must reproduce the above copyright notice, this
+       list of conditions and the following disclaimer in the documentation and/or
+       other materials provided with the distribution.
+
+    3. Neither the name of the copyright holder nor the names of its contributors
+       may be used to endorse or promote products derived from this software without
+       specific prior written permission.
+
+    THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+    IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+    INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT
+    NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+    PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+    WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+    ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY
+    OF SUCH DAMAGE.
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+import numpy as np
+
+from simple_dynamics_simulator.integrator import ButcherTableau
+
+# Changing how results are simulated or stored must change this, so that old entries are not reused
+CACHE_VERSION = 1
+
+
+def to_json_value(value):
+    
+    # json.dumps default for hashed descriptions. Every value must be described by its content, never by its repr,
+    # which may contain a memory address
+    if isinstance(value, ButcherTableau):
+        return {"a": value.a, "b": value.b, "b_error": value.b_error}
+    
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    
+    if isinstance(value, np.generic):
+        return value.item()
+    
+    raise Exception(f"Failed to describe value for hashing. Values of type '{type(value).__name__}' are not supported")
+
+
+class ResultCache:
+    
+    def __init__(self, directory, max_bytes=1 << 30):
+        
+        self._directory = directory
+        
+        self._max_bytes = max_bytes
+        
+        os.makedirs(directory, exist_ok=True)
+    
+    @staticmethod
+    def key(model, intial_state, inputs):
+        
+        integrator = model._integrator
+        
+        description = {"version": CACHE_VERSION, "model_class": f"{type(model).__module__}.{type(model).__qualname__}",
+                       "metadata": model.metadata(), "integrator": f"{type(integrator).__module__}.{type(integrator).__qualname__}"}
+        
+        hasher = hashlib.sha256(json.dumps(description, sort_keys=True, default=to_json_value).encode())
+        
+        for array in (intial_state, inputs):
+            
+            array = np.ascontiguousarray(array, dtype=np.float64)
+            
+            hasher.update(str(array.shape).encode())
+            
+            hasher.update(array.data)
+        
+        return hasher.hexdigest()
+    
+    def get(self, key):
+        
+        # Returns (time_axis, states, inputs) or None. A hit marks the entry as recently used
+        file_path = self._entry_path(key)
+        
+        try:
+            with np.load(file_path) as data:
+                result = (data["time_axis"], data["states"], data["inputs"])
+            
+            os.utime(file_path)
+        
+        # The entry may be missing or evicted by another process at any time
+        except (FileNotFoundError, OSError, ValueError, KeyError):
+            return None
+        
+        return result
+    
+    def put(self, key, time_axis, states, inputs):
+        
+        # Written to a temporary file first and moved into place, so readers never see a partial entry
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+        
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                np.savez(file, time_axis=time_axis, states=states, inputs=inputs)
+            
+            os.replace(temporary_path, self._entry_path(key))
+            
+        except BaseException:
+            
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            
+            raise
+        
+        self.evict()
+    
+    def evict(self):
+        
+        entries = []
+        
+        for entry in os.scandir(self._directory):
+            
+            if not entry.name.endswith(".npz"):
+                continue
+            
+            try:
+                stat = entry.stat()
+                
+            except FileNotFoundError:
+                continue
+            
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        
+        total_bytes = sum(size for _, size, _ in entries)
+        
+        # Least recently used first
+        for _, size, file_path in sorted(entries):
+            
+            if total_bytes <= self._max_bytes:
+                break
+            
+            try:
+                os.remove(file_path)
+                
+            except FileNotFoundError:
+                pass
+            
+            total_bytes -= size
+    
+    def clear(self):
+        
+        for entry in os.scandir(self._directory):
+            
+            if entry.name.endswith(".npz"):
+                os.remove(entry.path)
+    
+    def _entry_path(self, key):
+        return os.path.join(self._directory, f"{key}.npz")
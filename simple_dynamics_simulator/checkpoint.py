@@ -0,0 +1,157 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+File: checkpoint.py
+
+Description:
+    This script defines the CheckpointedSimulator class, a Simulator that keeps the last trajectory together with
+    checkpoints of the integrator every few steps. When run is called again with inputs that only differ after some
+    column, the unchanged prefix is reused and only the remaining steps are integrated. Changed columns are found by
+    hashing the inputs in blocks of one checkpoint interval.
+
+Author:
+    Loc Dang 
+
+Contact:
+    bobdbl99@gmail.com
+    
+Date:
+    October 17, 2026
+
+License:
+    BSD 3-Clause License
+
+    Redistribution and use in source and binary forms, with or without modification,
+    are permitted provided that the following conditions are met:
+
+    1. Redistributions of source code must retain the above copyright notice, this
+       list of conditions and the following disclaimer.
+
+    2. Redistributions in binary form must reproduce the above copyright notice, this
+       list of conditions and the following disclaimer in the documentation and/or
+       other materials provided with the distribution.
+
+    3. Neither the name of the copyright holder nor the names of its contributors
+       may be used to endorse or promote products derived from this software without
+       specific prior written permission.
+
+    THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+    IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+    INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT
+    NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+    PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+    WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+    ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY
+    OF SUCH DAMAGE.
+"""
+
+import hashlib
+import numpy as np
+from simple_dynamics_simulator.simulator import Simulator
+
+
+class CheckpointedSimulator(Simulator):
+    
+    def __init__(self, model, interval=100):
+        
+        # A rerun restarts at the checkpoint before the first changed input column, so at most interval - 1
+        # unchanged steps are integrated again
+        super().__init__(model)
+        
+        if interval < 1:
+            raise Exception(f"Failed to create checkpointed simulator. The interval must be positive, got {interval}")
+        
+        self._interval = interval
+        
+        self.invalidate()
+    
+    def invalidate(self):
+        
+        # Must be called when the model changes, e.g. after editing its parameters
+        self._intial_state = None
+        
+        self._states = None
+        
+        self._block_hashes = []
+        
+        # Integrator state before steps 0, interval, 2 * interval, ...
+        self._integrator_states = []
+        
+        self.restart_step = 0
+    
+    def run(self, intial_state, inputs, events=None):
+        
+        # Runs with events may stop early and are neither checkpointed nor reused
+        if events is not None:
+            return super().run(intial_state, inputs, events)
+        
+        # Same results as Simulator.run with the step loop. The compiled horizon is not used, since the length
+        # of the re-integrated part changes from run to run
+        intial_state, inputs, time_axis, states = self._prepare_run(intial_state, inputs)
+        
+        inputs = np.asarray(inputs, dtype=float)
+        
+        steps = inputs.shape[1]
+        
+        block_hashes = self._hash_blocks(inputs)
+        
+        restart_block = 0
+        
+        if self._states is not None and np.array_equal(self._intial_state, intial_state):
+            
+            while restart_block < min(len(block_hashes), len(self._block_hashes)) and block_hashes[restart_block] == self._block_hashes[restart_block]:
+                restart_block += 1
+            
+            # The checkpoint of a partially filled last block is still valid for the extended horizon
+            restart_block = min(restart_block, len(self._integrator_states) - 1)
+        
+        restart_step = min(restart_block * self._interval, steps)
+        
+        integrator = self._model._integrator
+        
+        if restart_block > 0:
+            
+            states[:, :restart_step + 1] = self._states[:, :restart_step + 1]
+            
+            integrator.set_state(self._integrator_states[restart_block])
+            
+            integrator_states = self._integrator_states[:restart_block]
+            
+        else:
+            # A full rerun starts from the same integrator state as the previous one
+            if len(self._integrator_states) > 0:
+                integrator.set_state(self._integrator_states[0])
+            
+            integrator_states = []
+        
+        for i in range(restart_step, steps):
+            
+            if i % self._interval == 0:
+                integrator_states.append(integrator.get_state())
+            
+            states[:, i+1] = self._model.step(states[:, i], inputs[:, i])
+        
+        if steps % self._interval == 0:
+            integrator_states.append(integrator.get_state())
+        
+        self._intial_state = np.array(intial_state, dtype=float)
+        
+        self._states = states
+        
+        self._block_hashes = block_hashes
+        
+        self._integrator_states = integrator_states
+        
+        self.restart_step = restart_step
+        
+        return self._finish_run(time_axis, states.copy(), inputs)
+    
+    def _hash_blocks(self, inputs):
+        
+        # Columns of one block are contiguous in the transposed copy
+        columns = np.ascontiguousarray(inputs.T)
+        
+        return [hashlib.blake2b(columns[start:start + self._interval].data, digest_size=16).digest() for start in range(0, columns.shape[0], self._interval)]
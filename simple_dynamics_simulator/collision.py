@@ -0,0 +1,389 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+File: collision.py
+
+Description:
+    This script defines the CollisionChecker class, which checks the rectangles of a robot's body parts against the
+    circles, rectangles and polygons of a Scene for every step of a trajectory. Obstacles are indexed in a uniform grid
+    (broad phase), and the remaining box-obstacle pairs are tested exactly in one vectorized pass (narrow phase).
+
+Author:
+    Loc Dang 
+
+Contact:
+    bobdbl99@gmail.com
+    
+Date:
+    October 17, 2026
+
+License:
+    BSD 3-Clause License
+
+    Redistribution and use in source and binary forms, with or without modification,
+    are permitted provided that the following conditions are met:
+
+    1. Redistributions of source code must retain the above copyright notice, this
+       list of conditions and the following disclaimer.
+
+    2. Redistributions in binary form must reproduce the above copyright notice, this
+       list of conditions and the following disclaimer in the documentation and/or
+       other materials provided with the distribution.
+
+    3. Neither the name of the copyright holder nor the names of its contributors
+       may be used to endorse or promote products derived from this software without
+       specific prior written permission.
+
+    THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+    IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+    INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT
+    NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+    PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+    WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+    ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY
+    OF SUCH DAMAGE.
+"""
+
+import numpy as np
+
+CIRCLE, RECTANGLE, SEGMENT, POLYGON_INTERIOR = 0, 1, 2, 3
+
+
+class CollisionResult:
+    
+    def __init__(self, flags, part_flags):
+        
+        # flags: (T,) True where any checked part collides, part_flags: part name -> (T,)
+        self.flags = flags
+        
+        self.part_flags = part_flags
+        
+        collisions = np.flatnonzero(flags)
+        
+        self.first_collision = int(collisions[0]) if len(collisions) > 0 else None
+        
+    @property
+    def collided(self):
+        return self.first_collision is not None
+
+
+class CollisionChecker:
+    
+    def __init__(self, scene, cell_size=None):
+        
+        # Polygons are checked through their edges, so open outlines such as the boundary only collide when crossed.
+        # Filled polygons are additionally checked for boxes lying completely inside them
+        self._scene = scene
+        
+        self._build_primitives()
+        
+        if cell_size is None:
+            
+            # About the size of a typical obstacle, large objects are registered in every cell they cover
+            extents = self._aabb_max - self._aabb_min
+            
+            cell_size = max(float(np.median(extents.max(axis=1))) if len(extents) > 0 else 1., 1e-3)
+        
+        self._cell_size = cell_size
+        
+        self._build_grid()
+    
+    def check_trajectory(self, model, states, parts=("tractor", "trailer")):
+        
+        # Checks the rectangles of the given body parts of model.graphic_model_batch for every column of states (nx, T)
+        graphic_model_batch = model.graphic_model_batch(states)
+        
+        centers, half_extents, angles = [], [], []
+        
+        for name in parts:
+            
+            if graphic_model_batch.types[graphic_model_batch.names.index(name)] != "rectangle":
+                raise Exception(f"Failed to check collision. The body part '{name}' is not a rectangle")
+            
+            poses = graphic_model_batch.part(name)
+            
+            centers.append(poses["center"])
+            
+            half_extents.append(poses["size"] / 2)
+            
+            angles.append(poses["angle"])
+        
+        box_flags = self.check_boxes(np.concatenate(centers), np.concatenate(half_extents), np.concatenate(angles))
+        
+        num_steps = states.shape[1]
+        
+        part_flags = {name: box_flags[index * num_steps:(index + 1) * num_steps] for index, name in enumerate(parts)}
+        
+        return CollisionResult(np.any(box_flags.reshape(len(parts), num_steps), axis=0), part_flags)
+    
+    def check_boxes(self, centers, half_extents, angles):
+        
+        # Oriented boxes given by centers (B, 2), half extents (B, 2) and angles (B,). Returns (B,) collision flags
+        centers = np.asarray(centers, dtype=float).reshape(-1, 2)
+        
+        half_extents = np.asarray(half_extents, dtype=float).reshape(-1, 2)
+        
+        angles = np.asarray(angles, dtype=float).reshape(-1)
+        
+        flags = np.zeros(len(centers), dtype=bool)
+        
+        if len(centers) == 0 or len(self._kinds) == 0:
+            return flags
+        
+        cos_angles, sin_angles = np.cos(angles), np.sin(angles)
+        
+        box_radius = np.stack((np.abs(cos_angles) * half_extents[:, 0] + np.abs(sin_angles) * half_extents[:, 1],
+                               np.abs(sin_angles) * half_extents[:, 0] + np.abs(cos_angles) * half_extents[:, 1]), axis=1)
+        
+        box_index, primitive_index = self._candidate_pairs(centers - box_radius, centers + box_radius)
+        
+        # Exact AABB overlap removes most pairs that only share a cell
+        overlap = np.all((centers[box_index] - box_radius[box_index] <= self._aabb_max[primitive_index]) &
+                         (centers[box_index] + box_radius[box_index] >= self._aabb_min[primitive_index]), axis=1)
+        
+        box_index, primitive_index = box_index[overlap], primitive_index[overlap]
+        
+        kinds = self._kinds[primitive_index]
+        
+        boxes = (centers, half_extents, cos_angles, sin_angles)
+        
+        for kind, test in ((CIRCLE, self._box_circle), (RECTANGLE, self._box_rectangle),
+                           (SEGMENT, self._box_segment), (POLYGON_INTERIOR, self._box_in_polygon)):
+            
+            mask = kinds == kind
+            
+            if np.any(mask):
+                
+                hits = test(boxes, box_index[mask], self._kind_index[primitive_index[mask]])
+                
+                flags[box_index[mask][hits]] = True
+        
+        return flags
+    
+    def _build_primitives(self):
+        
+        circles, rectangles, polygons = self._scene.circles, self._scene.rectangles, self._scene.polygons
+        
+        # Segments of every polygon edge, including the closing edge
+        offsets = polygons["offsets"]
+        
+        vertices = polygons["vertices"]
+        
+        sizes = np.diff(offsets)
+        
+        next_vertex = np.arange(len(vertices)) + 1
+        
+        if len(sizes) > 0:
+            next_vertex[offsets[1:] - 1] = offsets[:-1]
+        
+        self._segments = np.stack((vertices, vertices[next_vertex]), axis=1) if len(vertices) > 0 else np.zeros((0, 2, 2))
+        
+        self._segment_polygon = np.repeat(np.arange(len(sizes)), sizes)
+        
+        filled = np.array([self._scene.params_table[index].get("fill", True) for index in polygons["params_index"]], dtype=bool)
+        
+        self._filled_polygons = np.flatnonzero(filled)
+        
+        # Axis-aligned bounds of every primitive
+        circle_min = circles["centers"] - circles["radii"][:, np.newaxis]
+        
+        circle_max = circles["centers"] + circles["radii"][:, np.newaxis]
+        
+        cos_angles, sin_angles = np.cos(rectangles["angles"]), np.sin(rectangles["angles"])
+        
+        half_extents = rectangles["extents"] / 2
+        
+        rectangle_radius = np.stack((np.abs(cos_angles) * half_extents[:, 0] + np.abs(sin_angles) * half_extents[:, 1],
+                                     np.abs(sin_angles) * half_extents[:, 0] + np.abs(cos_angles) * half_extents[:, 1]), axis=1)
+        
+        polygon_min = np.array([vertices[offsets[index]:offsets[index + 1]].min(axis=0) for index in self._filled_polygons]).reshape(-1, 2)
+        
+        polygon_max = np.array([vertices[offsets[index]:offsets[index + 1]].max(axis=0) for index in self._filled_polygons]).reshape(-1, 2)
+        
+        self._aabb_min = np.concatenate((circle_min, rectangles["centers"] - rectangle_radius, self._segments.min(axis=1), polygon_min))
+        
+        self._aabb_max = np.concatenate((circle_max, rectangles["centers"] + rectangle_radius, self._segments.max(axis=1), polygon_max))
+        
+        counts = (len(circle_min), len(rectangle_radius), len(self._segments), len(self._filled_polygons))
+        
+        self._kinds = np.repeat(np.array([CIRCLE, RECTANGLE, SEGMENT, POLYGON_INTERIOR]), counts)
+        
+        self._kind_index = np.concatenate([np.arange(count) for count in counts])
+    
+    def _build_grid(self):
+        
+        self._origin = self._aabb_min.min(axis=0) if len(self._aabb_min) > 0 else np.zeros(2)
+        
+        upper = self._aabb_max.max(axis=0) if len(self._aabb_max) > 0 else np.zeros(2)
+        
+        self._grid_shape = np.floor((upper - self._origin) / self._cell_size).astype(np.int64) + 1
+        
+        primitive_index, cell_keys = self._cells(self._aabb_min, self._aabb_max)
+        
+        # Primitives sorted by cell, so the content of a cell is one contiguous range
+        order = np.argsort(cell_keys, kind="stable")
+        
+        self._cell_keys = cell_keys[order]
+        
+        self._cell_primitives = primitive_index[order]
+    
+    def _cells(self, aabb_min, aabb_max):
+        
+        # (item, cell key) pairs for every grid cell covered by each bounding box. Boxes outside the grid are clamped to it
+        lower = np.clip(np.floor((aabb_min - self._origin) / self._cell_size).astype(np.int64), 0, self._grid_shape - 1)
+        
+        upper = np.clip(np.floor((aabb_max - self._origin) / self._cell_size).astype(np.int64), 0, self._grid_shape - 1)
+        
+        spans = upper - lower + 1
+        
+        counts = spans[:, 0] * spans[:, 1]
+        
+        items = np.repeat(np.arange(len(aabb_min)), counts)
+        
+        # Position of every pair within the cells covered by its box
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        
+        cell_x = lower[items, 0] + local // spans[items, 1]
+        
+        cell_y = lower[items, 1] + local % spans[items, 1]
+        
+        return items, cell_x * self._grid_shape[1] + cell_y
+    
+    def _candidate_pairs(self, box_min, box_max):
+        
+        box_items, box_cells = self._cells(box_min, box_max)
+        
+        start = np.searchsorted(self._cell_keys, box_cells, side="left")
+        
+        stop = np.searchsorted(self._cell_keys, box_cells, side="right")
+        
+        counts = stop - start
+        
+        box_index = np.repeat(box_items, counts)
+        
+        positions = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(start, counts)
+        
+        primitive_index = self._cell_primitives[positions]
+        
+        # A pair found through several shared cells is tested once
+        unique_pairs = np.unique(box_index * len(self._kinds) + primitive_index)
+        
+        return unique_pairs // len(self._kinds), unique_pairs % len(self._kinds)
+    
+    @staticmethod
+    def _to_box_frame(boxes, box_index, points):
+        
+        centers, _, cos_angles, sin_angles = boxes
+        
+        offset = points - centers[box_index]
+        
+        cos_angle, sin_angle = cos_angles[box_index], sin_angles[box_index]
+        
+        return np.stack((cos_angle * offset[:, 0] + sin_angle * offset[:, 1],
+                         - sin_angle * offset[:, 0] + cos_angle * offset[:, 1]), axis=1)
+    
+    def _box_circle(self, boxes, box_index, circle_index):
+        
+        # Closest point of the box to the circle center
+        local_center = self._to_box_frame(boxes, box_index, self._scene.circles["centers"][circle_index])
+        
+        half_extents = boxes[1][box_index]
+        
+        distance = local_center - np.clip(local_center, -half_extents, half_extents)
+        
+        return np.sum(distance ** 2, axis=1) <= self._scene.circles["radii"][circle_index] ** 2
+    
+    def _box_rectangle(self, boxes, box_index, rectangle_index):
+        
+        # Separating axis test on the two edge normals of each box
+        centers, half_extents, cos_angles, sin_angles = boxes
+        
+        rectangles = self._scene.rectangles
+        
+        axes_a = np.stack((np.stack((cos_angles[box_index], sin_angles[box_index]), axis=1),
+                           np.stack((- sin_angles[box_index], cos_angles[box_index]), axis=1)), axis=1)
+        
+        cos_b, sin_b = np.cos(rectangles["angles"][rectangle_index]), np.sin(rectangles["angles"][rectangle_index])
+        
+        axes_b = np.stack((np.stack((cos_b, sin_b), axis=1), np.stack((- sin_b, cos_b), axis=1)), axis=1)
+        
+        half_a = half_extents[box_index]
+        
+        half_b = rectangles["extents"][rectangle_index] / 2
+        
+        offset = rectangles["centers"][rectangle_index] - centers[box_index]
+        
+        separated = np.zeros(len(box_index), dtype=bool)
+        
+        for axis in np.concatenate((axes_a, axes_b), axis=1).transpose(1, 0, 2):
+            
+            radius_a = np.sum(half_a * np.abs(np.einsum("nij,nj->ni", axes_a, axis)), axis=1)
+            
+            radius_b = np.sum(half_b * np.abs(np.einsum("nij,nj->ni", axes_b, axis)), axis=1)
+            
+            separated |= np.abs(np.sum(offset * axis, axis=1)) > radius_a + radius_b
+        
+        return ~separated
+    
+    def _box_segment(self, boxes, box_index, segment_index):
+        
+        # Slab test of the segment against the box in the box frame, also true for segments inside the box
+        start = self._to_box_frame(boxes, box_index, self._segments[segment_index, 0])
+        
+        direction = self._to_box_frame(boxes, box_index, self._segments[segment_index, 1]) - start
+        
+        half_extents = boxes[1][box_index]
+        
+        t_min = np.zeros(len(box_index))
+        
+        t_max = np.ones(len(box_index))
+        
+        inside = np.ones(len(box_index), dtype=bool)
+        
+        for axis in range(2):
+            
+            parallel = np.abs(direction[:, axis]) < 1e-12
+            
+            inside &= ~parallel | (np.abs(start[:, axis]) <= half_extents[:, axis])
+            
+            with np.errstate(divide="ignore", invalid="ignore"):
+                
+                t_first = (- half_extents[:, axis] - start[:, axis]) / direction[:, axis]
+                
+                t_second = (half_extents[:, axis] - start[:, axis]) / direction[:, axis]
+            
+            t_min = np.where(parallel, t_min, np.maximum(t_min, np.minimum(t_first, t_second)))
+            
+            t_max = np.where(parallel, t_max, np.minimum(t_max, np.maximum(t_first, t_second)))
+        
+        return inside & (t_min <= t_max)
+    
+    def _box_in_polygon(self, boxes, box_index, filled_index):
+        
+        # Crossing number of the box center against every edge of the polygon. Boxes that overlap an edge
+        # are already reported by the segment test, so the center decides for boxes without edge contact
+        polygon_index = self._filled_polygons[filled_index]
+        
+        offsets = self._scene.polygons["offsets"]
+        
+        counts = offsets[polygon_index + 1] - offsets[polygon_index]
+        
+        pair = np.repeat(np.arange(len(box_index)), counts)
+        
+        edges = self._segments[np.repeat(offsets[polygon_index], counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)]
+        
+        points = boxes[0][box_index][pair]
+        
+        (x0, y0), (x1, y1) = edges[:, 0].T, edges[:, 1].T
+        
+        straddles = (y0 > points[:, 1]) != (y1 > points[:, 1])
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            crossing_x = x0 + (points[:, 1] - y0) * (x1 - x0) / (y1 - y0)
+        
+        crossings = np.bincount(pair, weights=straddles & (points[:, 0] < crossing_x), minlength=len(box_index))
+        
+        return crossings % 2 == 1
@@ -0,0 +1,97 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+File: data_loader.py
+
+Description:
+    This script defines functions that load selected columns of CSV files, such as system inputs and reference paths,
+    straight into contiguous float64 arrays, either at once or in chunks for very large files.
+
+Author:
+    Loc Dang 
+
+Contact:
+    bobdbl99@gmail.com
+    
+Date:
+    October 17, 2026
+
+License:
+    BSD 3-Clause License
+
+    Redistribution and use in source and binary forms, with or without modification,
+    are permitted provided that the following conditions are met:
+
+    1. Redistributions of source code must retain the above copyright notice, this
+       list of conditions and the following disclaimer.
+
+    2. Redistributions in binary form must reproduce the above copyright notice, this
+       list of conditions and the following disclaimer in the documentation and/or
+       other materials provided with the distribution.
+
+    3. Neither the name of the copyright holder nor the names of its contributors
+       may be used to endorse or promote products derived from this software without
+       specific prior written permission.
+
+    THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+    IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+    INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT
+    NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+    PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+    WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+    ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY
+    OF SUCH DAMAGE.
+"""
+
+import itertools
+import numpy as np
+
+
+def read_header(file_path, delimiter=","):
+    
+    with open(file_path, "r") as file:
+        return [name.strip() for name in file.readline().rstrip("\r\n").split(delimiter)]
+
+
+def load_csv_columns(file_path, names, delimiter=","):
+    
+    # Returns an array of shape (len(names), rows), one row per requested column. Other columns are skipped by the parser
+    columns = _column_indices(file_path, names, delimiter)
+    
+    data = np.loadtxt(file_path, delimiter=delimiter, skiprows=1, usecols=columns, ndmin=2, dtype=float)
+    
+    return np.ascontiguousarray(data.T)
+
+
+def iter_csv_columns(file_path, names, chunk_size=100000, delimiter=","):
+    
+    # Yields blocks of shape (len(names), chunk_size) or less, e.g. as the inputs of Simulator.stream
+    columns = _column_indices(file_path, names, delimiter)
+    
+    with open(file_path, "r") as file:
+        
+        file.readline()
+        
+        while True:
+            
+            lines = list(itertools.islice(file, chunk_size))
+            
+            if len(lines) == 0:
+                return
+            
+            yield np.ascontiguousarray(np.loadtxt(lines, delimiter=delimiter, usecols=columns, ndmin=2, dtype=float).T)
+
+
+def _column_indices(file_path, names, delimiter):
+    
+    header = read_header(file_path, delimiter)
+    
+    missing_names = [name for name in names if name not in header]
+    
+    if len(missing_names) > 0:
+        raise Exception(f"Failed to load '{file_path}'. Columns {missing_names} were not found in the header {header}")
+    
+    return [header.index(name) for name in names]
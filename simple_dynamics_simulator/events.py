@@ -0,0 +1,257 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+File: events.py
+
+Description:
+    This script defines the Event class, which describes a condition of the simulated state by the zero crossing of a function,
+    and the EventDetector class, which locates these crossings inside the steps of a run by bisection.
+    Events can stop a run, change the state or the model, or simply be recorded.
+
+Author:
+    Loc Dang 
+
+Contact:
+    bobdbl99@gmail.com
+    
+Date:
+    October 17, 2026
+
+License:
+    BSD 3-Clause License
+
+    Redistribution and use in source and binary forms, with or without modification,
+    are permitted provided that the following conditions are met:
+
+    1. Redistributions of source code must retain the above copyright notice, this
+       list of conditions and the following disclaimer.
+
+    2. Redistributions in binary form must reproduce the above copyright notice, this
+       list of conditions and the following disclaimer in the documentation and/or
+       other materials provided with the distribution.
+
+    3. Neither the name of the copyright holder nor the names of its contributors
+       may be used to endorse or promote products derived from this software without
+       specific prior written permission.
+
+    THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+    IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+    INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT
+    NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+    PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+    WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+    ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY
+    OF SUCH DAMAGE.
+"""
+
+from functools import partial
+import numpy as np
+
+# Directions of a zero crossing. RISING triggers when the function goes from negative to zero or positive, FALLING the opposite
+RISING, FALLING, ANY = 1, -1, 0
+
+
+class Event:
+    
+    def __init__(self, function, direction=ANY, terminal=False, action=None, name=None):
+        
+        # function(time, state, model) returns a float whose zero crossings are the event.
+        # action(time, state, model) is called at the event and returns the state to continue from, or None to keep it.
+        # It may also change the model, e.g. to switch modes. A terminal event stops the run at the event
+        self.function = function
+        
+        self.direction = direction
+        
+        self.terminal = terminal
+        
+        self.action = action
+        
+        self.name = name if name is not None else getattr(function, "__name__", "event")
+        
+        if direction not in (RISING, FALLING, ANY):
+            raise Exception(f"Failed to create event '{self.name}'. The direction must be 1, -1 or 0, got {direction}")
+    
+    def crossed(self, value, next_value):
+        
+        if self.direction == RISING:
+            return value < 0 <= next_value
+        
+        if self.direction == FALLING:
+            return value > 0 >= next_value
+        
+        return (value < 0 <= next_value) or (value > 0 >= next_value)
+
+
+class EventOccurrence:
+    
+    def __init__(self, name, event_index, step, time, state):
+        
+        # step is the index of the step that contains the event, time lies within (time_axis[step], time_axis[step + 1]]
+        self.name = name
+        
+        self.event_index = event_index
+        
+        self.step = step
+        
+        self.time = time
+        
+        self.state = state
+    
+    def __repr__(self):
+        return f"EventOccurrence(name={self.name!r}, step={self.step}, time={self.time:.6f})"
+
+
+class EventDetector:
+    
+    def __init__(self, events, model, time_tolerance=1e-6):
+        
+        self._events = list(events)
+        
+        self._model = model
+        
+        # Bisection stops once the event is located within this many seconds
+        self._time_tolerance = time_tolerance
+        
+        self._values = None
+        
+        self.occurrences = []
+    
+    def start(self, time, state):
+        
+        self._values = self._evaluate(time, state)
+        
+        self.occurrences = []
+    
+    def advance(self, step, time, state, input, next_state=None):
+        
+        # Advances state over one step of the model. next_state may be given when it is already known.
+        # Returns the state at the end of the step, or at a terminal event, and whether the run has to stop
+        step_size = self._model._step_size
+        
+        start_time, values = time, self._values
+        
+        if next_state is None:
+            next_state = self._model.step(state, input)
+        
+        while True:
+            
+            duration = time + step_size - start_time
+            
+            next_values = self._evaluate(time + step_size, next_state)
+            
+            crossings = sorted(self._locate(index, start_time, state, input, duration, values[index])
+                               for index in range(len(self._events)) if self._events[index].crossed(values[index], next_values[index]))
+            
+            restarted = False
+            
+            for event_time, index, event_state in crossings:
+                
+                event = self._events[index]
+                
+                self.occurrences.append(EventOccurrence(event.name, index, step, event_time, event_state))
+                
+                if event.terminal:
+                    
+                    self._values = self._evaluate(event_time, event_state)
+                    
+                    return event_state, True
+                
+                if event.action is not None:
+                    
+                    new_state = event.action(event_time, event_state, self._model)
+                    
+                    # The rest of the step is integrated from the changed state. Later crossings of this step are
+                    # detected again on that remainder
+                    start_time, state = event_time, event_state if new_state is None else np.asarray(new_state, dtype=float)
+                    
+                    values = self._evaluate(start_time, state)
+                    
+                    next_state = self._model.partial_step(state, input, time + step_size - start_time)
+                    
+                    restarted = True
+                    
+                    break
+            
+            if not restarted:
+                
+                self._values = next_values
+                
+                return next_state, False
+    
+    def _locate(self, index, start_time, state, input, duration, value):
+        
+        # Bisection over the time since start_time. The returned time is the first point known to be past the crossing
+        event = self._events[index]
+        
+        lower, upper = 0., duration
+        
+        upper_state = None
+        
+        while upper - lower > self._time_tolerance:
+            
+            middle = (lower + upper) / 2
+            
+            middle_state = self._model.partial_step(state, input, middle)
+            
+            middle_value = self._value(event, start_time + middle, middle_state)
+            
+            if event.crossed(value, middle_value):
+                upper, upper_state = middle, middle_state
+                
+            else:
+                lower, value = middle, middle_value
+        
+        if upper_state is None:
+            upper_state = self._model.partial_step(state, input, upper)
+        
+        return start_time + upper, index, upper_state
+    
+    def _evaluate(self, time, state):
+        
+        return [self._value(event, time, state) for event in self._events]
+    
+    def _value(self, event, time, state):
+        
+        return float(event.function(time, state, self._model))
+
+
+def jackknife_event(max_hitch_angle, hitch_index=3, terminal=True):
+    
+    # Triggers when the absolute hitch angle state[hitch_index] exceeds max_hitch_angle (rad)
+    return Event(partial(_hitch_margin, max_hitch_angle, hitch_index), direction=FALLING, terminal=terminal, name="jackknife")
+
+
+def goal_reached_event(goal, tolerance, position_index=(0, 1), terminal=True):
+    
+    # Triggers when the point state[position_index] comes within tolerance of goal, e.g. the trailer
+    # reaching the last point of the reference path
+    return Event(partial(_goal_distance, np.asarray(goal, dtype=float), tolerance, list(position_index)),
+                 direction=FALLING, terminal=terminal, name="goal_reached")
+
+
+def collision_event(checker, parts=("tractor", "trailer"), terminal=True):
+    
+    # Triggers when a body part of the model hits the scene of a CollisionChecker. The function only takes
+    # the values -1 and 1, so the bisection locates the first contact within the time tolerance
+    return Event(partial(_collision_sign, checker, tuple(parts)), direction=FALLING, terminal=terminal, name="collision")
+
+
+# Event functions are module-level, so that events can be sent to sweep workers
+
+
+def _hitch_margin(max_hitch_angle, hitch_index, time, state, model):
+    
+    return max_hitch_angle - abs(state[hitch_index])
+
+
+def _goal_distance(goal, tolerance, position_index, time, state, model):
+    
+    return np.linalg.norm(state[position_index] - goal) - tolerance
+
+
+def _collision_sign(checker, parts, time, state, model):
+    
+    return -1. if checker.check_trajectory(model, np.reshape(state, (-1, 1)), parts).collided else 1.
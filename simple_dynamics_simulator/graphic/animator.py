@@ -45,17 +45,28 @@ License:
     OF SUCH DAMAGE.
 """
 
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib
 import matplotlib.pyplot as plt
 import numpy as np
 from math import cos, sin, pi
-from matplotlib.collections import PatchCollection
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PatchCollection, PolyCollection, EllipseCollection
+from matplotlib.figure import Figure
+from matplotlib.colors import to_rgba
+import matplotlib.image as mimage
 import matplotlib.lines as mlines
 import matplotlib.patches as mpatches
 import matplotlib.animation as animation
+from simple_dynamics_simulator.graphic.scene import Scene
 
 class Animator:
     
-    def __init__(self, param, model):
+    def __init__(self, param, model, headless=False):
         
         self._param = param
         
@@ -63,7 +74,19 @@ class Animator:
         
         self._frame_rate = param["desired_frame_rate"]
         
-        self._figure, self._axes = plt.subplots()
+        self._headless = headless
+        
+        # A headless animator renders offscreen with Agg and never touches pyplot or a display
+        if headless:
+            
+            self._figure = Figure()
+            
+            FigureCanvasAgg(self._figure)
+            
+            self._axes = self._figure.add_subplot()
+            
+        else:
+            self._figure, self._axes = plt.subplots()
             
     def run(self, states, static_paths={}, dynamic_paths={}, environment=[]):
         
@@ -71,6 +94,15 @@ class Animator:
 
         if len(dynamic_paths) > 0:
             dynamic_paths = self._truncate_dynamic_path_for_animate(dynamic_paths, extraction_ratio)
+        
+        # "func" creates the artists once and updates them per frame, "artist" prebuilds every frame
+        if self._param.get("backend", "artist") == "func":
+            
+            self._configure_plot_setting(static_paths.keys(), dynamic_paths.keys())
+            
+            self._animate_lazy(states, dynamic_paths, static_paths, environment)
+            
+            return
                                    
         dynamic_artists = self._generate_dynamic_artists(states, dynamic_paths)
                         
@@ -78,10 +110,144 @@ class Animator:
                           
         self._animate(dynamic_artists, static_paths, environment)
 
+    def run_fleet(self, states, static_paths={}, environment=[]):
+        
+        # states (T, nx, N) of a MultiAgentSimulator, drawn with the fleet model given to the constructor. The bodies
+        # of all agents share one PolyCollection and one EllipseCollection, which are updated in place per frame
+        states = states[0::self._extraction_ratio()]
+        
+        self._configure_plot_setting(static_paths.keys(), [])
+        
+        self._draw_static(static_paths, environment)
+        
+        fleet_artists = self._generate_fleet_artists(self._model.graphic_model_batch(states[0]))
+        
+        time_interval_between_frames = 1000 / self._frame_rate / self._param["speed_factor"] #in milisecond
+        
+        print(f"[Animator][Info] frame_rate: {self._frame_rate:.2f} fps , speed_factor: {self._param['speed_factor']}, agents: {states.shape[2]}")
+        
+        self._animation = animation.FuncAnimation(fig=self._figure,
+                                                  func=lambda frame: self._update_fleet_artists(self._model.graphic_model_batch(states[frame]), *fleet_artists),
+                                                  frames=states.shape[0],
+                                                  interval=time_interval_between_frames,
+                                                  repeat=self._param["repeat"],
+                                                  blit=True)
+        
+        if not self._headless:
+            plt.show()
+    
+    def _generate_fleet_artists(self, graphic_model_batch):
+        
+        # One color per body part, repeated for every agent
+        rectangle_parts = [index for index, type in enumerate(graphic_model_batch.types) if type == "rectangle"]
+        
+        circle_parts = [index for index, type in enumerate(graphic_model_batch.types) if type == "circle"]
+        
+        num_agents = len(graphic_model_batch)
+        
+        def part_colors(parts):
+            return np.repeat([to_rgba(graphic_model_batch.params[index].get("color", self._param["robot_color"]), graphic_model_batch.params[index].get("alpha"))
+                              for index in parts], num_agents, axis=0).reshape(-1, 4)
+        
+        rectangles = self._axes.add_collection(PolyCollection(np.zeros((len(rectangle_parts) * num_agents, 4, 2)), facecolors=part_colors(rectangle_parts), animated=True))
+        
+        circle_diameters = 2 * graphic_model_batch.poses["size"][circle_parts, :, 0].ravel()
+        
+        circles = self._axes.add_collection(EllipseCollection(circle_diameters, circle_diameters, np.zeros(len(circle_diameters)), units="xy",
+                                                              offsets=np.zeros((len(circle_diameters), 2)), offset_transform=self._axes.transData,
+                                                              facecolors=part_colors(circle_parts), animated=True))
+        
+        return rectangles, circles, rectangle_parts, circle_parts
+    
+    def _update_fleet_artists(self, graphic_model_batch, rectangles, circles, rectangle_parts, circle_parts):
+        
+        rectangle_poses = graphic_model_batch.poses[rectangle_parts].ravel()
+        
+        rectangles.set_verts(self._rectangle_corners(rectangle_poses["center"], rectangle_poses["size"], rectangle_poses["angle"]))
+        
+        circles.set_offsets(graphic_model_batch.poses[circle_parts].ravel()["center"])
+        
+        return [rectangles, circles]
+    
+    def export(self, file_path, states, static_paths={}, dynamic_paths={}, environment=[], workers=None):
+        
+        # Renders every frame offscreen and writes a .mp4, a .gif or, for any other path, a folder of PNG frames.
+        # The frame range is split into contiguous slices that are rendered by separate processes
+        states, extraction_ratio = self._truncate_state_for_animate(states)
+
+        if len(dynamic_paths) > 0:
+            dynamic_paths = self._truncate_dynamic_path_for_animate(dynamic_paths, extraction_ratio)
+        
+        extension = os.path.splitext(file_path)[1].lower()
+        
+        frame_folder = file_path if extension not in (".mp4", ".gif") else tempfile.mkdtemp(prefix="animator_frames_")
+        
+        os.makedirs(frame_folder, exist_ok=True)
+        
+        num_frames = states.shape[1]
+        
+        workers = min(workers or os.cpu_count() or 1, num_frames)
+        
+        frame_slices = [(num_frames * index // workers, num_frames * (index + 1) // workers) for index in range(workers)]
+        
+        print(f"[Animator][Info] Rendering {num_frames} frames with {workers} workers")
+        
+        try:
+            render_args = (self._param, self._model, states, static_paths, dynamic_paths, environment, frame_folder)
+            
+            if workers == 1:
+                _render_frames(*render_args, frame_slices[0])
+                
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    list(executor.map(_render_frames, *zip(*[render_args + (frame_slice,) for frame_slice in frame_slices])))
+            
+            frame_paths = [os.path.join(frame_folder, _frame_name(index)) for index in range(num_frames)]
+            
+            # Playback rate of the exported file, consistent with the interval used by run
+            playback_rate = self._frame_rate * self._param["speed_factor"]
+            
+            if extension == ".gif":
+                self._stitch_gif(file_path, frame_paths, playback_rate)
+                
+            elif extension == ".mp4":
+                self._stitch_mp4(file_path, frame_folder, playback_rate)
+                
+        finally:
+            if frame_folder != file_path:
+                shutil.rmtree(frame_folder, ignore_errors=True)
+        
+        print(f"[Animator][Info] Exported animation to {file_path}")
+    
+    @staticmethod
+    def _stitch_gif(file_path, frame_paths, playback_rate):
+        
+        from PIL import Image
+        
+        # Frames are opened one at a time while the GIF is written
+        first_frame = Image.open(frame_paths[0])
+        
+        first_frame.save(file_path, save_all=True, append_images=(Image.open(frame_path) for frame_path in frame_paths[1:]),
+                         duration=1000 / playback_rate, loop=0)
+    
+    @staticmethod
+    def _stitch_mp4(file_path, frame_folder, playback_rate):
+        
+        ffmpeg_path = matplotlib.rcParams["animation.ffmpeg_path"]
+        
+        if shutil.which(ffmpeg_path) is None:
+            raise Exception(f"[animator][Error] '{ffmpeg_path}' was not found. It is required to export .mp4 files")
+        
+        subprocess.run([ffmpeg_path, "-y", "-loglevel", "error", "-framerate", f"{playback_rate}",
+                        "-i", os.path.join(frame_folder, "frame_%06d.png"),
+                        "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p", file_path], check=True)
+    
     def _generate_dynamic_artists(self, states, dynamic_paths):
             
         dynamic_artists = []
         
+        graphic_model_batch = self._model.graphic_model_batch(states)
+        
         for i in  range(states.shape[1]):
             
             artist_collection = []
@@ -92,9 +258,7 @@ class Animator:
                 artist_collection += self._axes.plot(path_value[0, :i], path_value[1, :i], linestyle='-', color=self._param['dynamic_path_color'][index], label=path_name, animated=True)
   
             # Robot patch collection
-            state = states[:,i]
-            
-            graphic_model = self._model.graphic_model(state)
+            graphic_model = graphic_model_batch.frame(i)
 
             artist_collection += self._get_patch_collection(graphic_model, animated=True)
 
@@ -102,18 +266,154 @@ class Animator:
             
         return dynamic_artists
         
-    def _animate(self, dynamic_artists, static_paths, environment):
+    def _generate_lazy_artists(self, graphic_model_batch, dynamic_paths, animated=True):
+        
+        # One line per dynamic path and one patch per body part, reused by every frame
+        path_lines = []
+        
+        for index, (path_name, path_value) in enumerate(dynamic_paths.items()):
+            
+            path_lines += self._axes.plot([], [], linestyle='-', color=self._param['dynamic_path_color'][index], label=path_name, animated=animated)
+        
+        robot_patches = self._get_patch_collection(graphic_model_batch.frame(0), animated=animated)
+        
+        return path_lines, robot_patches
+    
+    def _update_lazy_artists(self, frame, graphic_model_batch, dynamic_paths, path_lines, robot_patches):
+        
+        # Path data are views of the truncated paths, nothing is copied per frame
+        for line, path_value in zip(path_lines, dynamic_paths.values()):
+            line.set_data(path_value[0, :frame], path_value[1, :frame])
+        
+        # Body-part poses of all frames were computed up front, patches only take the new values
+        for patch, type, pose in zip(robot_patches, graphic_model_batch.types, graphic_model_batch.poses[:, frame]):
+            
+            if type == "rectangle":
+                
+                patch.set_xy(pose["center"] - pose["size"] / 2)
+                
+                patch.set_angle(pose["angle"] * 180 / pi)
+            
+            else:
+                patch.set_center(pose["center"])
+        
+        return path_lines + robot_patches
+    
+    def _animate_lazy(self, states, dynamic_paths, static_paths, environment):
+        
+        self._draw_static(static_paths, environment)
+        
+        graphic_model_batch = self._model.graphic_model_batch(states)
+        
+        path_lines, robot_patches = self._generate_lazy_artists(graphic_model_batch, dynamic_paths)
+        
+        time_interval_between_frames = 1000 / self._frame_rate / self._param["speed_factor"] #in milisecond
+        
+        print(f"[Animator][Info] frame_rate: {self._frame_rate:.2f} fps , speed_factor: {self._param['speed_factor']}")
+        
+        # Keep a reference, otherwise the animation is garbage collected before it is shown
+        self._animation = animation.FuncAnimation(fig=self._figure,
+                                                  func=self._update_lazy_artists,
+                                                  frames=states.shape[1],
+                                                  init_func=lambda: path_lines + robot_patches,
+                                                  fargs=(graphic_model_batch, dynamic_paths, path_lines, robot_patches),
+                                                  interval=time_interval_between_frames,
+                                                  repeat=self._param["repeat"],
+                                                  blit=True)
+        
+        if not self._headless:
+            plt.show()
+    
+    def _draw_static(self, static_paths, environment):
         
-        # Static plot
         for index, (path_name, path_value) in enumerate(static_paths.items()):
 
             self._axes.plot(path_value[0, :], path_value[1, :], linestyle='dotted', color=self._param['static_path_color'][index], label=path_name)
         
             
+        if isinstance(environment, Scene):
+            self._draw_scene(environment)
+            print(f"[Animator][Info] Number of environment objects: {len(environment)}")
+            return
+            
         patch_collection = self._get_patch_collection(environment, animated=False)
         print(f"[Animator][Info] Number of environment objects: {len(patch_collection)}")
         for patch in patch_collection:
             self._axes.add_patch(patch)
+    
+    def _draw_scene(self, scene):
+        
+        # One collection per shape kind and distinct params instead of one patch per object
+        circles, rectangles, polygons = scene.circles, scene.rectangles, scene.polygons
+        
+        for params_index, indices in self._group_by_params(circles["params_index"]):
+            
+            diameters = 2 * circles["radii"][indices]
+            
+            self._axes.add_collection(EllipseCollection(diameters, diameters, np.zeros(len(indices)), units="xy",
+                                                        offsets=circles["centers"][indices], offset_transform=self._axes.transData,
+                                                        **self._collection_style(scene.params_table[params_index])))
+        
+        for params_index, indices in self._group_by_params(rectangles["params_index"]):
+            
+            corners = self._rectangle_corners(rectangles["centers"][indices], rectangles["extents"][indices], rectangles["angles"][indices])
+            
+            self._axes.add_collection(PolyCollection(corners, **self._collection_style(scene.params_table[params_index])))
+        
+        for params_index, indices in self._group_by_params(polygons["params_index"]):
+            
+            vertices = [scene.polygon_vertices(index) for index in indices]
+            
+            self._axes.add_collection(PolyCollection(vertices, **self._collection_style(scene.params_table[params_index])))
+    
+    @staticmethod
+    def _rectangle_corners(centers, extents, angles):
+        
+        # Corners (N, 4, 2) of rectangles given by centers (N, 2), (width, height) extents (N, 2) and angles (N,)
+        half_extents = extents[:, np.newaxis, :] / 2 * np.array([[-1, -1], [1, -1], [1, 1], [-1, 1]])
+        
+        cos_angles, sin_angles = np.cos(angles), np.sin(angles)
+        
+        corners = np.empty_like(half_extents)
+        
+        corners[..., 0] = cos_angles[:, np.newaxis] * half_extents[..., 0] - sin_angles[:, np.newaxis] * half_extents[..., 1]
+        
+        corners[..., 1] = sin_angles[:, np.newaxis] * half_extents[..., 0] + cos_angles[:, np.newaxis] * half_extents[..., 1]
+        
+        corners += centers[:, np.newaxis, :]
+        
+        return corners
+    
+    @staticmethod
+    def _group_by_params(params_index):
+        
+        params_groups, inverse = np.unique(params_index, return_inverse=True)
+        
+        return [(params_group, np.flatnonzero(inverse == group)) for group, params_group in enumerate(params_groups)]
+    
+    @staticmethod
+    def _collection_style(params):
+        
+        # Patch params of environment.yaml expressed as collection properties
+        style = dict(params)
+        
+        color = style.pop("color", None)
+        
+        if not style.pop("fill", True):
+            
+            style["facecolor"] = "none"
+            
+            style["edgecolor"] = "black" if color is None else color
+            
+        elif color is not None:
+            style["color"] = color
+        
+        return style
+    
+    def _animate(self, dynamic_artists, static_paths, environment):
+        
+        # Static plot
+        self._draw_static(static_paths, environment)
         
         # Dynamic plot
         time_interval_between_frames = 1000 / self._frame_rate / self._param["speed_factor"] #in milisecond
@@ -126,7 +426,8 @@ class Animator:
                                         repeat=self._param["repeat"],
                                         blit=True)
 
-        plt.show() 
+        if not self._headless:
+            plt.show()
            
     def _get_patch_collection(self, graphic_object_list, animated=False):
         
@@ -208,6 +509,15 @@ class Animator:
     
     def _truncate_state_for_animate(self, states):
         
+        extraction_ratio = self._extraction_ratio()
+        
+        states = states[:, 0::extraction_ratio]
+        
+        return states, extraction_ratio
+    
+    def _extraction_ratio(self):
+        
+        # Every extraction_ratio-th state becomes a frame. Also sets the resulting frame rate
         num_states_in_second = 1 / self._model._step_size
         
         if num_states_in_second < self._param["desired_frame_rate"]:
@@ -223,9 +533,7 @@ class Animator:
             
             self._frame_rate = 1 / (self._model._step_size * extraction_ratio)
         
-        states = states[:, 0::extraction_ratio]
-        
-        return states, extraction_ratio
+        return extraction_ratio
     
     @staticmethod
     def _truncate_dynamic_path_for_animate(dynamic_paths, extraction_ratio):
@@ -235,4 +543,32 @@ class Animator:
             dynamic_paths[path_name] = path_value[:, 0::extraction_ratio]
             
         return dynamic_paths
-                        
\ No newline at end of file
+
+
+def _frame_name(index):
+    
+    return f"frame_{index:06d}.png"
+
+
+def _render_frames(param, model, states, static_paths, dynamic_paths, environment, frame_folder, frame_slice):
+    
+    # Runs in a worker process: builds its own offscreen figure and renders frames [start, stop)
+    animator = Animator(param, model, headless=True)
+    
+    animator._configure_plot_setting(static_paths.keys(), dynamic_paths.keys())
+    
+    animator._draw_static(static_paths, environment)
+    
+    graphic_model_batch = model.graphic_model_batch(states)
+    
+    path_lines, robot_patches = animator._generate_lazy_artists(graphic_model_batch, dynamic_paths, animated=False)
+    
+    canvas = animator._figure.canvas
+    
+    for frame in range(*frame_slice):
+        
+        animator._update_lazy_artists(frame, graphic_model_batch, dynamic_paths, path_lines, robot_patches)
+        
+        canvas.draw()
+        
+        mimage.imsave(os.path.join(frame_folder, _frame_name(frame)), np.asarray(canvas.buffer_rgba()))
@@ -5,7 +5,8 @@
 File: graphic_object.py
 
 Description:
-    This script defines the Rectangle, Circle, and Polygon classes, which are used to represent graphic objects in the simulation.
+    This script defines the Rectangle, Circle, and Polygon classes, which are used to represent graphic objects in the simulation,
+    and the GraphicModelBatch class, which holds the body-part poses of a whole trajectory in structured arrays.
 
 Author:
     Loc Dang 
@@ -45,9 +46,16 @@ License:
     OF SUCH DAMAGE.
 """
 
+import numpy as np
+
+# Pose of one body part in one frame. size is (width, height) for rectangles and (radius, radius) for circles
+GRAPHIC_POSE_DTYPE = np.dtype([("center", float, (2,)), ("angle", float), ("size", float, (2,))])
+
 
 class Rectangle:
     
+    __slots__ = ("name", "center", "width", "height", "rotate_angle", "params", "type")
+    
     def __init__(self, name, center, width, height, rotate_angle=0, params={}):
         self.name = name
         self.center = center
@@ -59,6 +67,8 @@ class Rectangle:
 
 class Circle:
     
+    __slots__ = ("name", "center", "radius", "params", "type")
+    
     def __init__(self, name, center, radius, params={}):
         self.name = name
         self.center = center
@@ -67,9 +77,76 @@ class Circle:
         self.type = "circle"
         
 class Polygon:
+    
+    __slots__ = ("name", "vertices", "params", "type")
         
     def __init__(self, name, vertices, params={}):
         self.name = name
         self.vertices = vertices
         self.params = params
-        self.type = "polygon"
\ No newline at end of file
+        self.type = "polygon"
+
+class GraphicModelBatch:
+    
+    # Body-part poses of a whole trajectory: poses has shape (num_parts, T) with GRAPHIC_POSE_DTYPE
+    def __init__(self, names, types, params, poses):
+        self.names = names
+        self.types = types
+        self.params = params
+        self.poses = poses
+    
+    def __len__(self):
+        return self.poses.shape[1]
+    
+    def part(self, name):
+        return self.poses[self.names.index(name)]
+    
+    def frame(self, index):
+        
+        # The same objects Model.graphic_model returns for a single state
+        graphic_objects = []
+        
+        for name, type, params, pose in zip(self.names, self.types, self.params, self.poses[:, index]):
+            
+            if type == "rectangle":
+                graphic_objects.append(Rectangle(name, pose["center"], pose["size"][0], pose["size"][1], rotate_angle=pose["angle"], params=params))
+                
+            elif type == "circle":
+                graphic_objects.append(Circle(name, pose["center"], pose["size"][0], params=params))
+                
+            else:
+                raise Exception(f"Failed to create graphic object. '{type}' is not supported in a graphic model batch")
+        
+        return graphic_objects
+    
+    @classmethod
+    def from_graphic_models(cls, graphic_models):
+        
+        # Packs a list of per-frame graphic models, e.g. [model.graphic_model(state) for state in states.T]
+        first_frame = graphic_models[0]
+        
+        poses = np.zeros((len(first_frame), len(graphic_models)), dtype=GRAPHIC_POSE_DTYPE)
+        
+        for frame, graphic_model in enumerate(graphic_models):
+            
+            for part, graphic_object in enumerate(graphic_model):
+                
+                poses[part, frame]["center"] = graphic_object.center
+                
+                if graphic_object.type == "rectangle":
+                    
+                    poses[part, frame]["angle"] = graphic_object.rotate_angle
+                    
+                    poses[part, frame]["size"] = (graphic_object.width, graphic_object.height)
+                    
+                elif graphic_object.type == "circle":
+                    
+                    poses[part, frame]["size"] = (graphic_object.radius, graphic_object.radius)
+                    
+                else:
+                    raise Exception(f"Failed to pack graphic model. '{graphic_object.type}' is not supported in a graphic model batch")
+        
+        return cls([graphic_object.name for graphic_object in first_frame],
+                   [graphic_object.type for graphic_object in first_frame],
+                   [graphic_object.params for graphic_object in first_frame],
+                   poses)
@@ -0,0 +1,258 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+File: scene.py
+
+Description:
+    This script defines the Scene class, which stores the objects of an environment in typed NumPy arrays,
+    one set of arrays per shape kind, instead of one Python object per obstacle.
+    Iterating over a Scene yields lightweight views that behave like the classes in graphic_object.py.
+
+Author:
+    Loc Dang 
+
+Contact:
+    bobdbl99@gmail.com
+    
+Date:
+    October 17, 2026
+
+License:
+    BSD 3-Clause License
+
+    Redistribution and use in source and binary forms, with or without modification,
+    are permitted provided that the following conditions are met:
+
+    1. Redistributions of source code must retain the above copyright notice, this
+       list of conditions and the following disclaimer.
+
+    2. Redistributions in binary form must reproduce the above copyright notice, this
+       list of conditions and the following disclaimer in the documentation and/or
+       other materials provided with the distribution.
+
+    3. Neither the name of the copyright holder nor the names of its contributors
+       may be used to endorse or promote products derived from this software without
+       specific prior written permission.
+
+    THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+    IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+    INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT
+    NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+    PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+    WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+    ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY
+    OF SUCH DAMAGE.
+"""
+
+import os
+import json
+import yaml
+import numpy as np
+
+# The C loader parses large environment files several times faster when libyaml is available
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+class Scene:
+    
+    def __init__(self, circles, rectangles, polygons, params_table):
+        
+        # circles:    names (Nc,), centers (Nc, 2), radii (Nc,), params_index (Nc,)
+        # rectangles: names (Nr,), centers (Nr, 2), extents (Nr, 2) as (width, height), angles (Nr,), params_index (Nr,)
+        # polygons:   names (Np,), vertices (M, 2), offsets (Np + 1,) into vertices, params_index (Np,)
+        # params_table holds every distinct params dict once, objects refer to it by index
+        self.circles = circles
+        
+        self.rectangles = rectangles
+        
+        self.polygons = polygons
+        
+        self.params_table = params_table
+    
+    def __len__(self):
+        return len(self.circles["names"]) + len(self.rectangles["names"]) + len(self.polygons["names"])
+    
+    def __iter__(self):
+        
+        for index in range(len(self.rectangles["names"])):
+            yield RectangleView(self, index)
+        
+        for index in range(len(self.circles["names"])):
+            yield CircleView(self, index)
+        
+        for index in range(len(self.polygons["names"])):
+            yield PolygonView(self, index)
+    
+    def polygon_vertices(self, index):
+        
+        return self.polygons["vertices"][self.polygons["offsets"][index]:self.polygons["offsets"][index + 1]]
+    
+    @classmethod
+    def from_yaml(cls, file_path, cache_path=None):
+        
+        # Parsing YAML dominates the load time of large environments. With a cache path, the parsed
+        # scene is stored as .npz and reused for as long as it is newer than the YAML file
+        if cache_path is not None and os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(file_path):
+            return cls.load(cache_path)
+        
+        with open(file_path, "r") as file:
+            object_list = yaml.load(file, Loader=YAML_LOADER)
+            
+        scene = cls.from_object_list(object_list or [])
+        
+        if cache_path is not None:
+            scene.save(cache_path)
+            
+        return scene
+    
+    @classmethod
+    def from_object_list(cls, object_list):
+        
+        # object_list uses the format of environment.yaml
+        params_table, params_lookup = [], {}
+        
+        columns = {kind: {"names": [], "params_index": []} for kind in ("circle", "rectangle", "polygon")}
+        
+        circle_centers, circle_radii = [], []
+        
+        rectangle_centers, rectangle_extents, rectangle_angles = [], [], []
+        
+        polygon_vertices, polygon_sizes = [], []
+        
+        for object in object_list:
+            
+            object_type = object["type"]
+            
+            if object_type not in columns:
+                raise Exception("Failed to generate graphic object. The object type is not supported. Please use 'rectangle', 'circle', or 'polygon'")
+            
+            params = object.get("params", {})
+            
+            params_key = json.dumps(params, sort_keys=True)
+            
+            if params_key not in params_lookup:
+                
+                params_lookup[params_key] = len(params_table)
+                
+                params_table.append(params)
+            
+            columns[object_type]["names"].append(object["name"])
+            
+            columns[object_type]["params_index"].append(params_lookup[params_key])
+            
+            if object_type == "circle":
+                
+                circle_centers.append(object["center"])
+                
+                circle_radii.append(object["radius"])
+            
+            elif object_type == "rectangle":
+                
+                rectangle_centers.append(object["center"])
+                
+                rectangle_extents.append((object["width"], object["height"]))
+                
+                rectangle_angles.append(object.get("rotate_angle", 0.))
+            
+            else:
+                polygon_vertices += object["vertices"]
+                
+                polygon_sizes.append(len(object["vertices"]))
+        
+        circles = cls._columns(columns["circle"], centers=np.asarray(circle_centers, dtype=float).reshape(-1, 2),
+                               radii=np.asarray(circle_radii, dtype=float))
+        
+        rectangles = cls._columns(columns["rectangle"], centers=np.asarray(rectangle_centers, dtype=float).reshape(-1, 2),
+                                  extents=np.asarray(rectangle_extents, dtype=float).reshape(-1, 2),
+                                  angles=np.asarray(rectangle_angles, dtype=float))
+        
+        polygons = cls._columns(columns["polygon"], vertices=np.asarray(polygon_vertices, dtype=float).reshape(-1, 2),
+                                offsets=np.concatenate(([0], np.cumsum(polygon_sizes, dtype=np.int64))))
+        
+        return cls(circles, rectangles, polygons, params_table)
+    
+    def save(self, file_path):
+        
+        # Binary copy of the scene, loads without parsing YAML
+        arrays = {f"{kind}_{name}": value for kind, columns in (("circles", self.circles), ("rectangles", self.rectangles), ("polygons", self.polygons))
+                  for name, value in columns.items()}
+        
+        with open(file_path, "wb") as file:
+            np.savez(file, params_table=np.array(json.dumps(self.params_table)), **arrays)
+    
+    @classmethod
+    def load(cls, file_path):
+        
+        with np.load(file_path) as data:
+            
+            kinds = {kind: {} for kind in ("circles", "rectangles", "polygons")}
+            
+            for key in data.files:
+                
+                kind, _, name = key.partition("_")
+                
+                if kind in kinds:
+                    kinds[kind][name] = data[key]
+            
+            return cls(kinds["circles"], kinds["rectangles"], kinds["polygons"], json.loads(str(data["params_table"])))
+    
+    @staticmethod
+    def _columns(columns, **arrays):
+        
+        arrays["names"] = np.asarray(columns["names"], dtype=str)
+        
+        arrays["params_index"] = np.asarray(columns["params_index"], dtype=np.int32)
+        
+        return arrays
+
+
+class RectangleView:
+    
+    __slots__ = ("_scene", "_index")
+    
+    type = "rectangle"
+    
+    def __init__(self, scene, index):
+        self._scene = scene
+        self._index = index
+    
+    name = property(lambda self: str(self._scene.rectangles["names"][self._index]))
+    center = property(lambda self: self._scene.rectangles["centers"][self._index])
+    width = property(lambda self: self._scene.rectangles["extents"][self._index, 0])
+    height = property(lambda self: self._scene.rectangles["extents"][self._index, 1])
+    rotate_angle = property(lambda self: self._scene.rectangles["angles"][self._index])
+    params = property(lambda self: self._scene.params_table[self._scene.rectangles["params_index"][self._index]])
+
+
+class CircleView:
+    
+    __slots__ = ("_scene", "_index")
+    
+    type = "circle"
+    
+    def __init__(self, scene, index):
+        self._scene = scene
+        self._index = index
+    
+    name = property(lambda self: str(self._scene.circles["names"][self._index]))
+    center = property(lambda self: self._scene.circles["centers"][self._index])
+    radius = property(lambda self: self._scene.circles["radii"][self._index])
+    params = property(lambda self: self._scene.params_table[self._scene.circles["params_index"][self._index]])
+
+
+class PolygonView:
+    
+    __slots__ = ("_scene", "_index")
+    
+    type = "polygon"
+    
+    def __init__(self, scene, index):
+        self._scene = scene
+        self._index = index
+    
+    name = property(lambda self: str(self._scene.polygons["names"][self._index]))
+    vertices = property(lambda self: self._scene.polygon_vertices(self._index))
+    params = property(lambda self: self._scene.params_table[self._scene.polygons["params_index"][self._index]])
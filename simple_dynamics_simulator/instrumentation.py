@@ -0,0 +1,239 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+File: instrumentation.py
+
+Description:
+    This script defines the Instrumentation class, an opt-in recorder for Simulator runs. It counts dynamics
+    evaluations and steps, times every integrator stage, step and input/output handling, tracks allocations, calls
+    user callbacks before and after every step, and exports the results as a stats dict or as Chrome-trace JSON
+    (chrome://tracing, Perfetto). Simulator does not touch any of this when no instrumentation is given.
+
+Author:
+    Loc Dang 
+
+Contact:
+    bobdbl99@gmail.com
+    
+Date:
+    October 17, 2026
+
+License:
+    BSD 3-Clause License
+
+    Redistribution and use in source and binary forms, with or without modification,
+    are permitted provided that the following conditions are met:
+
+    1. Redistributions of source code must retain the above copyright notice, this
+       list of conditions and the following disclaimer.
+
+    2. Redistributions in binary form must reproduce the above copyright notice, this
+       list of conditions and the following disclaimer in the documentation and/or
+       other materials provided with the distribution.
+
+    3. Neither the name of the copyright holder nor the names of its contributors
+       may be used to endorse or promote products derived from this software without
+       specific prior written permission.
+
+    THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+    IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+    INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT
+    NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+    PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+    WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+    ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY
+    OF SUCH DAMAGE.
+"""
+
+import os
+import sys
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class Instrumentation:
+    
+    def __init__(self, trace=True, track_allocations=False, max_trace_events=1000000):
+        
+        # trace keeps every span for the Chrome trace, otherwise only the aggregated timings are kept.
+        # track_allocations traces memory with tracemalloc during runs, which slows them down
+        self._trace = trace
+        
+        self._track_allocations = track_allocations
+        
+        self._max_trace_events = max_trace_events
+        
+        self._pre_step_callbacks = []
+        
+        self._post_step_callbacks = []
+        
+        self.reset()
+    
+    def reset(self):
+        
+        self._counters = {"runs": 0, "steps": 0, "dynamics_evaluations": 0}
+        
+        # allocated_blocks is the net change of allocated Python blocks over runs, including the recorded trace events
+        self._allocations = {"allocated_blocks": 0, "peak_memory": 0}
+        
+        # name -> [count, total, max] in seconds
+        self._timings = {}
+        
+        # (name, category, start, duration)
+        self._events = []
+        
+        self._origin = time.perf_counter()
+        
+        self._stage = 0
+    
+    def add_pre_step(self, callback):
+        
+        # callback(step, state, input) is called before the step is computed
+        self._pre_step_callbacks.append(callback)
+    
+    def add_post_step(self, callback):
+        
+        # callback(step, state, input, next_state) is called after the step is computed
+        self._post_step_callbacks.append(callback)
+    
+    @property
+    def has_step_callbacks(self):
+        return len(self._pre_step_callbacks) > 0 or len(self._post_step_callbacks) > 0
+    
+    @contextmanager
+    def run(self, name):
+        
+        # Wraps a whole simulator call
+        start_tracing = self._track_allocations and not tracemalloc.is_tracing()
+        
+        if start_tracing:
+            tracemalloc.start()
+        
+        if self._track_allocations:
+            tracemalloc.reset_peak()
+        
+        allocated_blocks = sys.getallocatedblocks()
+        
+        start = time.perf_counter()
+        
+        try:
+            yield self
+            
+        finally:
+            self.record(name, start, time.perf_counter(), "run")
+            
+            self._counters["runs"] += 1
+            
+            self._allocations["allocated_blocks"] += sys.getallocatedblocks() - allocated_blocks
+            
+            if self._track_allocations:
+                self._allocations["peak_memory"] = max(self._allocations["peak_memory"], tracemalloc.get_traced_memory()[1])
+            
+            if start_tracing:
+                tracemalloc.stop()
+    
+    @contextmanager
+    def span(self, name, category="simulator"):
+        
+        start = time.perf_counter()
+        
+        try:
+            yield
+            
+        finally:
+            self.record(name, start, time.perf_counter(), category)
+    
+    def record(self, name, start, end, category="simulator"):
+        
+        duration = end - start
+        
+        timing = self._timings.get(name)
+        
+        if timing is None:
+            timing = self._timings[name] = [0, 0., 0.]
+        
+        timing[0] += 1
+        
+        timing[1] += duration
+        
+        timing[2] = max(timing[2], duration)
+        
+        if self._trace and len(self._events) < self._max_trace_events:
+            self._events.append((name, category, start, duration))
+    
+    def wrap_dynamics(self, dynamics):
+        
+        # Counts and times every evaluation. The Runge-Kutta integrators report the stage of every evaluation
+        # through set_stage, so adaptive methods record stages 0-6 of each attempt. Integrators without this
+        # hook get the evaluations numbered in order within the current step
+        def instrumented_dynamics(state, input):
+            
+            start = time.perf_counter()
+            
+            state_dot = dynamics(state, input)
+            
+            self.record(f"dynamics/stage{self._stage}", start, time.perf_counter(), "dynamics")
+            
+            self._stage += 1
+            
+            self._counters["dynamics_evaluations"] += 1
+            
+            return state_dot
+        
+        instrumented_dynamics.set_stage = self._set_stage
+        
+        return instrumented_dynamics
+    
+    def _set_stage(self, stage):
+        self._stage = stage
+    
+    def pre_step(self, step, state, input):
+        
+        self._stage = 0
+        
+        for callback in self._pre_step_callbacks:
+            callback(step, state, input)
+    
+    def post_step(self, step, state, input, next_state):
+        
+        self._counters["steps"] += 1
+        
+        for callback in self._post_step_callbacks:
+            callback(step, state, input, next_state)
+    
+    def count_steps(self, steps):
+        
+        # For steps that are computed without per-step hooks, e.g. by a compiled horizon
+        self._counters["steps"] += steps
+    
+    def stats(self):
+        
+        timings = {name: {"count": count, "total": total, "mean": total / count, "max": maximum}
+                   for name, (count, total, maximum) in self._timings.items()}
+        
+        return dict(self._counters, allocations=dict(self._allocations), timings=timings)
+    
+    def chrome_trace(self):
+        
+        # Complete events ("ph": "X") with timestamps in microseconds since the last reset
+        process_id = os.getpid()
+        
+        events = [{"name": name, "cat": category, "ph": "X", "ts": (start - self._origin) * 1e6, "dur": duration * 1e6,
+                   "pid": process_id, "tid": 0} for name, category, start, duration in self._events]
+        
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"stats": self.stats()}}
+    
+    def save_chrome_trace(self, file_path):
+        
+        with open(file_path, "w") as file:
+            json.dump(self.chrome_trace(), file)
+    
+    def save_stats(self, file_path):
+        
+        with open(file_path, "w") as file:
+            json.dump(self.stats(), file, indent=2)
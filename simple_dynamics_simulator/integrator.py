@@ -0,0 +1,299 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+File: integrator.py
+
+Description:
+    This script defines the integrators used by Model.step to discretize the continuous dynamics.
+    Explicit Runge-Kutta methods are described by Butcher tableaus, which are resolved by name from a registry
+    when the model is constructed. User-defined tableaus can be registered with register_integrator.
+
+Author:
+    Loc Dang 
+
+Contact:
+    bobdbl99@gmail.com
+    
+Date:
+    October 17, 2026
+
+License:
+    BSD 3-Clause License
+
+    Redistribution and use in source and binary forms, with or without modification,
+    are permitted provided that the following conditions are met:
+
+    1. Redistributions of source code must retain the above copyright notice, this
+       list of conditions and the following disclaimer.
+
+    2. Redistributions in binary form must reproduce the above copyright notice, this
+       list of conditions and the following disclaimer in the documentation and/or
+       other materials provided with the distribution.
+
+    3. Neither the name of the copyright holder nor the names of its contributors
+       may be used to endorse or promote products derived from this software without
+       specific prior written permission.
+
+    THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+    IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+    INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT
+    NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+    PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+    WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+    ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY
+    OF SUCH DAMAGE.
+"""
+
+import numpy as np
+
+
+class ButcherTableau:
+    
+    def __init__(self, a, b, b_error=None):
+        
+        # a: lower triangular stage weights (row i has i entries), b: weights of the solution,
+        # b_error: optional weights of the embedded lower order solution used for error control
+        self.a = [list(map(float, row)) for row in a]
+        
+        self.b = list(map(float, b))
+        
+        self.b_error = None if b_error is None else list(map(float, b_error))
+        
+        self.num_stages = len(self.b)
+        
+        if len(self.a) != self.num_stages or any(len(row) != index for index, row in enumerate(self.a)):
+            raise Exception("Failed to create Butcher tableau. Row i of 'a' must have i entries and 'a' must have as many rows as 'b'")
+
+
+EULER = ButcherTableau([[]], [1.])
+
+HEUN = ButcherTableau([[], [1.]], [1/2, 1/2])
+
+RK4 = ButcherTableau([[], [1/2], [0., 1/2], [0., 0., 1.]], [1/6, 1/3, 1/3, 1/6])
+
+RK38 = ButcherTableau([[], [1/3], [-1/3, 1.], [1., -1., 1.]], [1/8, 3/8, 3/8, 1/8])
+
+SSPRK3 = ButcherTableau([[], [1.], [1/4, 1/4]], [1/6, 1/6, 2/3])
+
+# Dormand-Prince 5(4). The last row of 'a' equals 'b', so the final stage is the
+# derivative at the new state and is reused as the next first stage
+DOPRI5 = ButcherTableau(
+    [[],
+     [1/5],
+     [3/40, 9/40],
+     [44/45, -56/15, 32/9],
+     [19372/6561, -25360/2187, 64448/6561, -212/729],
+     [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+     [35/384, 0., 500/1113, 125/192, -2187/6784, 11/84]],
+    [35/384, 0., 500/1113, 125/192, -2187/6784, 11/84, 0.],
+    b_error=[5179/57600, 0., 7571/16695, 393/640, -92097/339200, 187/2100, 1/40])
+
+
+class ExplicitRungeKutta:
+    
+    adaptive = False
+    
+    def __init__(self, tableau, step_size, **options):
+        
+        self._tableau = tableau
+        
+        self._step_size = step_size
+        
+        # Non-zero stage weights are scaled by the step size once instead of on every step
+        self._stage_weights = self._scale_weights(tableau.a, step_size)
+        
+        self._solution_weights = self._scale_weights([tableau.b], step_size)[0]
+        
+        # Stage buffers per state shape, so single states and batches can share one integrator
+        self._buffers = {}
+        
+    def step(self, dynamics, state, input):
+        
+        stages, stage_state, scratch = self._get_buffers(state.shape)
+        
+        self._evaluate_stages(dynamics, state, input, self._stage_weights, stages, stage_state, scratch)
+        
+        return self._accumulate(state, stages, self._solution_weights, np.empty_like(state), scratch)
+    
+    def symbolic_step(self, dynamics, state, input):
+        
+        # Plain arithmetic, so that the update can be traced with CasADi symbols
+        stages = []
+        
+        for weights in self._stage_weights:
+            stages.append(dynamics(state + sum(weight * stages[index] for index, weight in weights), input))
+            
+        return state + sum(weight * stages[index] for index, weight in self._solution_weights)
+    
+    def get_state(self):
+        
+        # Internal state that affects the next step, restored when a run is resumed part-way
+        return None
+    
+    def set_state(self, integrator_state):
+        pass
+    
+    def _get_buffers(self, shape):
+        
+        if shape not in self._buffers:
+            self._buffers[shape] = ([None] * self._tableau.num_stages, np.empty(shape), np.empty(shape))
+            
+        return self._buffers[shape]
+    
+    @classmethod
+    def _evaluate_stages(cls, dynamics, state, input, stage_weights, stages, stage_state, scratch, first_stage=None):
+        
+        # Instrumented dynamics are told the stage of every evaluation, see Instrumentation.wrap_dynamics
+        set_stage = getattr(dynamics, "set_stage", None)
+        
+        for index, weights in enumerate(stage_weights):
+            
+            if set_stage is not None:
+                set_stage(index)
+            
+            if index == 0 and first_stage is not None:
+                stages[0] = first_stage
+            
+            elif len(weights) == 0:
+                stages[index] = dynamics(state, input)
+            
+            else:
+                stages[index] = dynamics(cls._accumulate(state, stages, weights, stage_state, scratch), input)
+    
+    @staticmethod
+    def _accumulate(state, stages, weights, out, scratch):
+        
+        # out = state + sum(weight * stage) without allocating temporaries
+        np.copyto(out, state)
+        
+        for index, weight in weights:
+            
+            np.multiply(stages[index], weight, out=scratch)
+            
+            out += scratch
+        
+        return out
+    
+    @staticmethod
+    def _scale_weights(rows, step_size):
+        
+        return [[(index, weight * step_size) for index, weight in enumerate(row) if weight != 0.] for row in rows]
+
+
+class DormandPrince(ExplicitRungeKutta):
+    
+    # Integrates over one output interval with embedded error control. The input is held constant and
+    # the last accepted internal step size is kept as the first guess of the next interval
+    adaptive = True
+    
+    def __init__(self, step_size, rtol=1e-6, atol=1e-8, **options):
+        
+        super().__init__(DOPRI5, step_size)
+        
+        self._rtol = rtol
+        
+        self._atol = atol
+        
+        self._error_weights = [b - b_error for b, b_error in zip(DOPRI5.b, DOPRI5.b_error)]
+        
+        self._internal_step = None
+    
+    def step(self, dynamics, state, input):
+        
+        stages, stage_state, scratch = self._get_buffers(state.shape)
+        
+        elapsed, interval = 0., self._step_size
+        
+        step = interval if self._internal_step is None else min(self._internal_step, interval)
+        
+        set_stage = getattr(dynamics, "set_stage", None)
+        
+        if set_stage is not None:
+            set_stage(0)
+        
+        first_stage = dynamics(state, input)
+        
+        while interval - elapsed > 1e-12 * interval:
+            
+            step = min(step, interval - elapsed)
+            
+            # Weights depend on the internal step, which changes between attempts
+            stage_weights = self._scale_weights(self._tableau.a, step)
+            
+            self._evaluate_stages(dynamics, state, input, stage_weights, stages, stage_state, scratch, first_stage=first_stage)
+            
+            # The last stage was evaluated at the 5th order solution, which is still held in stage_state
+            error = self._accumulate(0., stages, self._scale_weights([self._error_weights], step)[0], np.empty_like(state), scratch)
+            
+            scale = self._atol + self._rtol * np.maximum(np.abs(state), np.abs(stage_state))
+            
+            # RMS norm per trajectory, the worst trajectory of a batch decides
+            error_norm = np.max(np.sqrt(np.mean((error / scale) ** 2, axis=0)))
+            
+            if error_norm <= 1.:
+                
+                elapsed += step
+                
+                state = stage_state.copy()
+                
+                first_stage = stages[-1]
+            
+            factor = 5. if error_norm == 0. else min(5., max(0.2, 0.9 * error_norm ** (-1/5)))
+            
+            step *= factor
+            
+            if step < 1e-12 * interval:
+                raise Exception(f"Failed to integrate with 'RK45'. The step size fell below {1e-12 * interval:.3e}")
+        
+        self._internal_step = step
+        
+        return state
+    
+    def symbolic_step(self, dynamics, state, input):
+        
+        raise Exception("Failed to build a symbolic step. The number of internal steps of 'RK45' depends on the state")
+    
+    def get_state(self):
+        
+        return self._internal_step
+    
+    def set_state(self, integrator_state):
+        
+        self._internal_step = integrator_state
+
+
+INTEGRATORS = {}
+
+
+def register_integrator(name, factory):
+    
+    # factory(step_size, **options) returns an integrator with step, symbolic_step, get_state and set_state
+    INTEGRATORS[name] = factory
+
+
+def get_integrator(method, step_size, **options):
+    
+    if isinstance(method, ButcherTableau):
+        return ExplicitRungeKutta(method, step_size, **options)
+    
+    if isinstance(method, dict):
+        return ExplicitRungeKutta(ButcherTableau(method["a"], method["b"]), step_size, **options)
+    
+    if method not in INTEGRATORS:
+        raise Exception(f"The discrete method '{method}' has not supported. Available methods: {', '.join(INTEGRATORS)}")
+    
+    return INTEGRATORS[method](step_size, **options)
+
+
+def _tableau_factory(tableau):
+    
+    return lambda step_size, **options: ExplicitRungeKutta(tableau, step_size, **options)
+
+
+for _name, _tableau in [("KR1", EULER), ("Euler", EULER), ("Heun", HEUN), ("KR4", RK4), ("RK4", RK4), ("RK38", RK38), ("SSPRK3", SSPRK3)]:
+    register_integrator(_name, _tableau_factory(_tableau))
+
+register_integrator("RK45", DormandPrince)
@@ -48,6 +48,9 @@ License:
 
 from abc import ABC, abstractmethod
 import numpy as np
+from simple_dynamics_simulator.integrator import get_integrator
+from simple_dynamics_simulator.backend import load_casadi
+from simple_dynamics_simulator.graphic.graphic_object import GraphicModelBatch
 
 class Model(ABC):
     
@@ -55,6 +58,8 @@ class Model(ABC):
         
         super().__init__()
         
+        self._standard_params = params
+        
         self._nx = params["num_states"]
         
         self._nu = params["num_inputs"]
@@ -62,6 +67,17 @@ class Model(ABC):
         self._discrete_method = params["discrete_method"]
 
         self._step_size = params["step_size"]
+        
+        # Resolved once here instead of on every step. For adaptive methods step_size is only the
+        # output grid and rtol/atol control the internal steps
+        self._integrator_options = {"rtol": params.get("rtol", 1e-6), "atol": params.get("atol", 1e-8)}
+        
+        self._integrator = get_integrator(self._discrete_method, self._step_size, **self._integrator_options)
+        
+        # When enabled, Simulator.run evaluates the whole horizon with one CasADi call
+        self._compiled = params.get("compiled", False)
+        
+        self._compiled_functions = {}
     
     @abstractmethod
     def dynamics(self, state, input):
@@ -70,32 +86,110 @@ class Model(ABC):
     @abstractmethod
     def graphic_model(self, state):
         pass
+    
+    def graphic_model_batch(self, states):
+        
+        # Body-part poses for every column of states (nx, T). Models should override this with a vectorized version
+        return GraphicModelBatch.from_graphic_models([self.graphic_model(states[:, i]) for i in range(states.shape[1])])
+        
+    def metadata(self):
+        
+        # Describes the model for result files. Subclasses add their own parameters
+        return {"model": type(self).__name__, "standard_params": self._standard_params}
         
     def step(self, state, input):
-
-        state = np.asarray(state)
         
-        input = np.asarray(input)
+        # state and input are either single vectors of shape (nx,), (nu,) or batches
+        # stored column-wise with shape (nx, N), (nu, N). dynamics must accept both.
+        state = np.asarray(state, dtype=float)
+        
+        input = np.asarray(input, dtype=float)
+        
+        return self._integrator.step(self.dynamics, state, input)
+    
+    def partial_step(self, state, input, duration):
+        
+        # One step of the same method over duration instead of step_size, used to locate events inside a step
+        integrator = get_integrator(self._discrete_method, duration, **self._integrator_options)
+        
+        return integrator.step(self.dynamics, np.asarray(state, dtype=float), np.asarray(input, dtype=float))
+    
+    def compiled_step(self):
+        
+        if "step" not in self._compiled_functions:
+            
+            cs = load_casadi()
+            
+            state = cs.SX.sym("state", self._nx)
+            
+            input = cs.SX.sym("input", self._nu)
+            
+            next_state = self._integrator.symbolic_step(self._symbolic_dynamics, state, input)
+            
+            self._compiled_functions["step"] = cs.Function("step", [state, input], [next_state], ["state", "input"], ["next_state"])
+            
+        return self._compiled_functions["step"]
+    
+    def compiled_horizon(self, steps):
+        
+        # Maps (initial_state, inputs[nu x steps]) to states[nx x steps] with a single native call
+        key = ("horizon", steps)
         
-        if self._discrete_method == "KR1":
+        if key not in self._compiled_functions:
+            self._compiled_functions[key] = self.compiled_step().mapaccum("horizon", steps)
             
-            state_dot = self.dynamics(state, input)
-                
-            state += self._step_size * state_dot
+        return self._compiled_functions[key]
+    
+    def compiled_jacobians(self):
         
-        elif self._discrete_method == "KR4":
+        # Exact Jacobians A = d next_state / d state and B = d next_state / d input of the discretized step
+        if "jacobians" not in self._compiled_functions:
             
-            k1 = self.dynamics(state, input)
+            cs = load_casadi()
             
-            k2 = self.dynamics(state + 1/2*self._step_size*k1, input)
+            state = cs.SX.sym("state", self._nx)
             
-            k3 = self.dynamics(state + 1/2*self._step_size*k2, input)
+            input = cs.SX.sym("input", self._nu)
             
-            k4 = self.dynamics(state + self._step_size*k3, input)
-
-            state += 1/6 * self._step_size * (k1 + 2*k2 + 2*k3 + k4)
+            next_state = self.compiled_step()(state, input)
             
-        else:
-            raise Exception(f"The discrete method '{self._discrete_method}' has not supported")
+            self._compiled_functions["jacobians"] = cs.Function("jacobians", [state, input], [cs.jacobian(next_state, state), cs.jacobian(next_state, input)],
+                                                                ["state", "input"], ["A", "B"])
+            
+        return self._compiled_functions["jacobians"]
+    
+    def linearize_trajectory(self, states, inputs):
+        
+        # Jacobians at every column of states (nx, T) and inputs (nu, T), evaluated with one batched call.
+        # Returns A with shape (T, nx, nx) and B with shape (T, nx, nu)
+        states = np.asarray(states, dtype=float)
+        
+        inputs = np.asarray(inputs, dtype=float)
+        
+        if states.ndim != 2 or states.shape[0] != self._nx or inputs.ndim != 2 or inputs.shape[0] != self._nu or states.shape[1] != inputs.shape[1]:
+            raise Exception(f"Failed to linearize trajectory. The states and inputs are expected to have shapes ({self._nx}, T) and ({self._nu}, T), got {states.shape} and {inputs.shape}")
+        
+        steps = states.shape[1]
+        
+        key = ("jacobians", steps)
+        
+        if key not in self._compiled_functions:
+            self._compiled_functions[key] = self.compiled_jacobians().map(steps)
+        
+        A, B = self._compiled_functions[key](states, inputs)
+        
+        # The mapped outputs are the Jacobians of all points stacked horizontally
+        A = A.full().reshape(self._nx, steps, self._nx).transpose(1, 0, 2)
+        
+        B = B.full().reshape(self._nx, steps, self._nu).transpose(1, 0, 2)
+        
+        return A, B
+    
+    def _symbolic_dynamics(self, state, input):
+        
+        # dynamics unpacks its arguments element-wise, which CasADi matrices do not support
+        cs = load_casadi()
+        
+        state_dot = self.dynamics(cs.vertsplit(state), cs.vertsplit(input))
         
-        return state
\ No newline at end of file
+        return cs.vertcat(*[state_dot[i] for i in range(self._nx)])
@@ -0,0 +1,335 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+File: monte_carlo.py
+
+Description:
+    This script defines the MonteCarlo class, which simulates many noisy copies of one scenario: the initial state,
+    the inputs and the state after every step are perturbed with Gaussian noise. Samples are integrated together as
+    one (nx, N) array per batch, and every batch draws from its own random stream spawned from one seed, so results
+    do not depend on the number of worker processes. Only summary statistics are kept: the mean and covariance of
+    the state at every step, and histograms from which quantiles are read.
+
+Author:
+    Loc Dang 
+
+Contact:
+    bobdbl99@gmail.com
+    
+Date:
+    October 17, 2026
+
+License:
+    BSD 3-Clause License
+
+    Redistribution and use in source and binary forms, with or without modification,
+    are permitted provided that the following conditions are met:
+
+    1. Redistributions of source code must retain the above copyright notice, this
+       list of conditions and the following disclaimer.
+
+    2. Redistributions in binary form must reproduce the above copyright notice, this
+       list of conditions and the following disclaimer in the documentation and/or
+       other materials provided with the distribution.
+
+    3. Neither the name of the copyright holder nor the names of its contributors
+       may be used to endorse or promote products derived from this software without
+       specific prior written permission.
+
+    THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+    IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+    INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT
+    NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+    PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+    WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+    ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY
+    OF SUCH DAMAGE.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# Per-process state of a Monte Carlo worker, set once by _initialize_worker
+_worker = {}
+
+# Number of steps with quantiles when quantile_stride is not given, which bounds the histograms of long horizons
+MAX_QUANTILE_STEPS = 1000
+
+# Histograms above this size are reported, since every batch sends its histogram back to the parent process
+HISTOGRAM_WARNING_BYTES = 100 * 1024**2
+
+
+class RunningStatistics:
+    
+    def __init__(self, num_steps, num_states, lower, upper, bins=256, stride=1):
+        
+        # Mean (num_steps, nx) and scatter matrices (num_steps, nx, nx) of the samples seen so far, and histograms
+        # of every stride-th step between lower and upper (num_quantile_steps, nx). Values outside the range are
+        # counted in the outermost bins
+        self.count = 0
+        
+        self.mean = np.zeros((num_steps, num_states))
+        
+        self.m2 = np.zeros((num_steps, num_states, num_states))
+        
+        self._lower = lower
+        
+        self._upper = upper
+        
+        self._bins = bins
+        
+        self._stride = stride
+        
+        self.histogram = np.zeros((len(lower), num_states, bins), dtype=np.int64)
+    
+    def add_step(self, step, states):
+        
+        # All samples of one batch at one step, states (nx, N). Every step of a batch is added exactly once
+        mean = states.mean(axis=1)
+        
+        centered = states - mean[:, np.newaxis]
+        
+        self.mean[step] = mean
+        
+        self.m2[step] = centered @ centered.T
+        
+        if step % self._stride == 0:
+            
+            index = step // self._stride
+            
+            width = (self._upper[index] - self._lower[index]) / self._bins
+            
+            bins = np.clip(np.floor((states - self._lower[index][:, np.newaxis]) / width[:, np.newaxis]), 0, self._bins - 1).astype(np.int64)
+            
+            bins += np.arange(states.shape[0])[:, np.newaxis] * self._bins
+            
+            self.histogram[index] += np.bincount(bins.ravel(), minlength=states.shape[0] * self._bins).reshape(states.shape[0], self._bins)
+    
+    def merge(self, other):
+        
+        # Pairwise update of Chan et al., exact up to rounding
+        count = self.count + other.count
+        
+        delta = other.mean - self.mean
+        
+        self.m2 += other.m2 + delta[:, :, np.newaxis] * delta[:, np.newaxis, :] * (self.count * other.count / count)
+        
+        self.mean += delta * (other.count / count)
+        
+        self.histogram += other.histogram
+        
+        self.count = count
+    
+    def covariance(self):
+        
+        return self.m2 / max(self.count - 1, 1)
+    
+    def quantiles(self, levels):
+        
+        # Linear interpolation inside the histogram bin that contains each level. Returns (len(levels), nx, num_quantile_steps)
+        cumulative = np.cumsum(self.histogram, axis=-1)
+        
+        width = (self._upper - self._lower) / self._bins
+        
+        quantiles = []
+        
+        for level in levels:
+            
+            target = level * self.count
+            
+            index = np.minimum(np.sum(cumulative < target, axis=-1), self._bins - 1)
+            
+            previous = np.where(index > 0, np.take_along_axis(cumulative, np.maximum(index - 1, 0)[..., np.newaxis], axis=-1)[..., 0], 0)
+            
+            in_bin = np.take_along_axis(self.histogram, index[..., np.newaxis], axis=-1)[..., 0]
+            
+            fraction = np.clip((target - previous) / np.maximum(in_bin, 1), 0., 1.)
+            
+            quantiles.append((self._lower + (index + fraction) * width).T)
+        
+        return np.array(quantiles)
+
+
+class MonteCarloResult:
+    
+    def __init__(self, time_axis, statistics, levels, stride):
+        
+        # mean: (nx, T+1), covariance: (T+1, nx, nx), quantiles: level -> (nx, len(quantile_time_axis))
+        self.time_axis = time_axis
+        
+        self.count = statistics.count
+        
+        self.mean = statistics.mean.T
+        
+        self.covariance = statistics.covariance()
+        
+        self.quantile_time_axis = time_axis[::stride]
+        
+        self.quantiles = dict(zip(levels, statistics.quantiles(levels)))
+    
+    @property
+    def std(self):
+        return np.sqrt(np.diagonal(self.covariance, axis1=1, axis2=2)).T
+
+
+class MonteCarlo:
+    
+    def __init__(self, model_class, model_params, intial_state, inputs, num_samples, batch_size=1000, initial_state_std=0.,
+                 input_noise_std=0., process_noise_std=0., seed=0, max_workers=None, quantile_levels=(0.05, 0.5, 0.95),
+                 bins=256, quantile_stride=None):
+        
+        # Noise is Gaussian with independent components. The standard deviations are scalars or per-component
+        # arrays: initial_state_std (nx,) once per sample, input_noise_std (nu,) on the input of every step and
+        # process_noise_std (nx,) added to the state after every step. Histograms take num_steps / quantile_stride
+        # * nx * bins * 8 bytes per batch. By default the stride keeps at most MAX_QUANTILE_STEPS steps with quantiles
+        self._model_class = model_class
+        
+        self._model_params = model_params
+        
+        self._intial_state = np.asarray(intial_state, dtype=float)
+        
+        self._inputs = np.asarray(inputs, dtype=float)
+        
+        standard_params = model_params["standard_params"]
+        
+        num_states, num_inputs = standard_params["num_states"], standard_params["num_inputs"]
+        
+        if self._intial_state.shape != (num_states,) or self._inputs.ndim != 2 or self._inputs.shape[0] != num_inputs:
+            raise Exception(f"Failed to create Monte Carlo simulation. The initial state and inputs are expected to have shapes ({num_states},) and ({num_inputs}, T)")
+        
+        self._noise = (np.broadcast_to(np.asarray(initial_state_std, dtype=float), (num_states,)),
+                       np.broadcast_to(np.asarray(input_noise_std, dtype=float), (num_inputs,)),
+                       np.broadcast_to(np.asarray(process_noise_std, dtype=float), (num_states,)))
+        
+        # The batches and their random streams only depend on the number of samples, the batch size and the seed
+        self._batch_sizes = [min(batch_size, num_samples - start) for start in range(0, num_samples, batch_size)]
+        
+        self._seeds = np.random.SeedSequence(seed).spawn(len(self._batch_sizes))
+        
+        self._max_workers = max_workers
+        
+        self._quantile_levels = tuple(quantile_levels)
+        
+        self._bins = bins
+        
+        num_steps = self._inputs.shape[1] + 1
+        
+        self._quantile_stride = -(-num_steps // MAX_QUANTILE_STEPS) if quantile_stride is None else quantile_stride
+        
+        histogram_bytes = -(-num_steps // self._quantile_stride) * num_states * bins * 8
+        
+        if histogram_bytes > HISTOGRAM_WARNING_BYTES:
+            print(f"[MonteCarlo][Warn] The histograms take {histogram_bytes / 1024**2:.0f} MB per batch. Increase quantile_stride or reduce bins to lower it")
+    
+    def run(self):
+        
+        steps = self._inputs.shape[1]
+        
+        model = self._model_class(self._model_params)
+        
+        time_axis = np.linspace(0, steps * model._step_size, num=steps+1)
+        
+        integrator_state = model._integrator.get_state()
+        
+        # The first batch fixes the histogram ranges, half its spread is added on both sides. It is simulated twice from
+        # the same random stream, once for the ranges and once for the statistics, instead of keeping its trajectories
+        num_quantile_steps = len(time_axis[::self._quantile_stride])
+        
+        lower, upper = np.empty((num_quantile_steps, model._nx)), np.empty((num_quantile_steps, model._nx))
+        
+        def track_range(step, states):
+            
+            if step % self._quantile_stride == 0:
+                
+                lower[step // self._quantile_stride] = states.min(axis=1)
+                
+                upper[step // self._quantile_stride] = states.max(axis=1)
+        
+        _simulate_batch(model, integrator_state, self._intial_state, self._inputs, self._noise, self._seeds[0], self._batch_sizes[0], track_range)
+        
+        margin = 0.5 * (upper - lower) + 1e-9 * (1 + np.abs(upper))
+        
+        histogram_range = (lower - margin, upper + margin)
+        
+        statistics = self._new_statistics(model, histogram_range, self._batch_sizes[0])
+        
+        _simulate_batch(model, integrator_state, self._intial_state, self._inputs, self._noise, self._seeds[0], self._batch_sizes[0], statistics.add_step)
+        
+        print(f"[MonteCarlo][Info] Simulating {sum(self._batch_sizes)} samples in {len(self._batch_sizes)} batches")
+        
+        remaining = list(range(1, len(self._batch_sizes)))
+        
+        if len(remaining) > 0:
+            
+            # Batches are merged in order, so the result is the same for any number of workers
+            initargs = (self._model_class, self._model_params, self._intial_state, self._inputs, self._noise, histogram_range, self._bins, self._quantile_stride)
+            
+            with ProcessPoolExecutor(max_workers=self._max_workers, initializer=_initialize_worker, initargs=initargs) as executor:
+                
+                for batch_statistics in executor.map(_run_batch, [self._seeds[index] for index in remaining], [self._batch_sizes[index] for index in remaining]):
+                    statistics.merge(batch_statistics)
+        
+        return MonteCarloResult(time_axis, statistics, self._quantile_levels, self._quantile_stride)
+    
+    def _new_statistics(self, model, histogram_range, count):
+        
+        statistics = RunningStatistics(self._inputs.shape[1] + 1, model._nx, histogram_range[0], histogram_range[1], self._bins, self._quantile_stride)
+        
+        statistics.count = count
+        
+        return statistics
+
+
+def _simulate_batch(model, integrator_state, intial_state, inputs, noise, seed, size, add_step):
+    
+    # Calls add_step(step, states) with the states (nx, N) of the batch at every step. The same seed gives the same samples
+    initial_state_std, input_noise_std, process_noise_std = noise
+    
+    rng = np.random.default_rng(seed)
+    
+    # Adaptive integrators keep their internal step between calls. Every batch starts from the same one
+    model._integrator.set_state(integrator_state)
+    
+    steps = inputs.shape[1]
+    
+    state = intial_state[:, np.newaxis] + initial_state_std[:, np.newaxis] * rng.standard_normal((model._nx, size))
+    
+    for k in range(steps + 1):
+        
+        add_step(k, state)
+        
+        if k == steps:
+            break
+        
+        input = inputs[:, k:k+1] + input_noise_std[:, np.newaxis] * rng.standard_normal((model._nu, size))
+        
+        state = model.step(state, input) + process_noise_std[:, np.newaxis] * rng.standard_normal((model._nx, size))
+
+
+def _initialize_worker(model_class, model_params, intial_state, inputs, noise, histogram_range, bins, stride):
+    
+    _worker["model"] = model_class(model_params)
+    
+    _worker["integrator_state"] = _worker["model"]._integrator.get_state()
+    
+    _worker["arguments"] = (intial_state, inputs, noise)
+    
+    _worker["statistics"] = (histogram_range, bins, stride)
+
+
+def _run_batch(seed, size):
+    
+    model = _worker["model"]
+    
+    (lower, upper), bins, stride = _worker["statistics"]
+    
+    statistics = RunningStatistics(_worker["arguments"][1].shape[1] + 1, model._nx, lower, upper, bins, stride)
+    
+    statistics.count = size
+    
+    _simulate_batch(model, _worker["integrator_state"], *_worker["arguments"], seed, size, statistics.add_step)
+    
+    return statistics
@@ -0,0 +1,130 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+File: multi_agent.py
+
+Description:
+    This script defines the MultiAgentSimulator class, which simulates a fleet of robots of one model class in a shared
+    environment. The states of all agents are kept in one (nx, N) struct-of-arrays buffer and advanced with one
+    vectorized step per tick. Agents may differ in their model parameters, which are passed to the model as arrays with
+    one value per agent.
+
+Author:
+    Loc Dang 
+
+Contact:
+    bobdbl99@gmail.com
+    
+Date:
+    October 17, 2026
+
+License:
+    BSD 3-Clause License
+
+    Redistribution and use in source and binary forms, with or without modification,
+    are permitted provided that the following conditions are met:
+
+    1. Redistributions of source code must retain the above copyright notice, this
+       list of conditions and the following disclaimer.
+
+    2. Redistributions in binary form must reproduce the above copyright notice, this
+       list of conditions and the following disclaimer in the documentation and/or
+       other materials provided with the distribution.
+
+    3. Neither the name of the copyright holder nor the names of its contributors
+       may be used to endorse or promote products derived from this software without
+       specific prior written permission.
+
+    THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+    IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+    INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT
+    NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+    PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+    WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+    ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY
+    OF SUCH DAMAGE.
+"""
+
+import numpy as np
+from simple_dynamics_simulator.sweep import apply_overrides
+
+
+class MultiAgentSimulator:
+    
+    def __init__(self, model_class, model_params, num_agents, agent_params={}):
+        
+        # agent_params maps parameter names (as for ParameterSweep, e.g. "length_back") to one value per agent. The
+        # model must broadcast these arrays against states of shape (nx, N), as TractorTrailerModel does
+        overrides = {name: np.broadcast_to(np.asarray(values, dtype=float), (num_agents,)).copy() for name, values in agent_params.items()}
+        
+        self._model = model_class(apply_overrides(model_params, overrides))
+        
+        if self._model._compiled:
+            raise Exception("Failed to create multi-agent simulator. Compiled models do not support per-agent parameters")
+        
+        self._num_agents = num_agents
+        
+        # Row i holds state i of every agent
+        self._state = np.zeros((self._model._nx, num_agents))
+    
+    @property
+    def model(self):
+        return self._model
+    
+    @property
+    def num_agents(self):
+        return self._num_agents
+    
+    @property
+    def state(self):
+        return self._state
+    
+    def reset(self, intial_states):
+        
+        intial_states = np.asarray(intial_states, dtype=float)
+        
+        if intial_states.shape != self._state.shape:
+            raise Exception(f"Failed to reset agents. The initial states are expected to have shape {self._state.shape}, got {intial_states.shape}")
+        
+        self._state[:] = intial_states
+    
+    def step(self, inputs):
+        
+        # Advances every agent by one step with inputs of shape (nu, N)
+        self._state[:] = self._model.step(self._state, inputs)
+        
+        return self._state
+    
+    def run(self, intial_states, inputs):
+        
+        # intial_states: (nx, N), inputs: (T, nu, N). Returns states (T+1, nx, N) and inputs padded to (T+1, nu, N),
+        # so that every tick of the fleet is one contiguous block
+        inputs = np.asarray(inputs, dtype=float)
+        
+        if inputs.ndim != 3 or inputs.shape[1:] != (self._model._nu, self._num_agents):
+            raise Exception(f"Failed to run agents. The inputs are expected to have shape (T, {self._model._nu}, {self._num_agents}), got {inputs.shape}")
+        
+        self.reset(intial_states)
+        
+        steps = inputs.shape[0]
+        
+        states = np.empty((steps + 1, self._model._nx, self._num_agents))
+        
+        states[0] = self._state
+        
+        for i in range(steps):
+            states[i+1] = self.step(inputs[i])
+        
+        time_axis = np.linspace(0, steps * self._model._step_size, num=steps+1)
+        
+        inputs = np.concatenate((inputs, np.zeros((1, self._model._nu, self._num_agents))), axis=0)
+        
+        return time_axis, states, inputs
+    
+    def graphic_model_batch(self, states=None):
+        
+        # Body-part poses of all agents at one tick, poses have shape (num_parts, N)
+        return self._model.graphic_model_batch(self._state if states is None else states)
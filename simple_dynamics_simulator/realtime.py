@@ -0,0 +1,328 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+File: realtime.py
+
+Description:
+    This script defines the RealTimeServer class, which steps a Model at wall-clock rate (or speed_factor times
+    real time) with asyncio. Input commands are received and states are published to any number of subscribers over
+    a TCP or UNIX socket as JSON lines. Every subscriber has a bounded queue that drops its oldest message when full,
+    so a slow consumer never stalls the stepping loop. Deadline misses, step latency and wake-up jitter are exposed
+    as metrics.
+    
+    Protocol (one JSON object per line):
+        client -> server: {"type": "input", "input": [v, w]}, {"type": "reset", "state": [...]}, {"type": "metrics"}
+        server -> client: {"type": "state", "step": k, "time": t, "state": [...], "input": [...]},
+                          {"type": "metrics", ...}, {"type": "error", "message": "..."}
+
+Author:
+    Loc Dang 
+
+Contact:
+    bobdbl99@gmail.com
+    
+Date:
+    October 17, 2026
+
+License:
+    BSD 3-Clause License
+
+    Redistribution and use in source and binary forms, with or without modification,
+    are permitted provided that the following conditions are met:
+
+    1. Redistributions of source code must retain the above copyright notice, this
+       list of conditions and the following disclaimer.
+
+    2. Redistributions in binary form must reproduce the above copyright notice, this
+       list of conditions and the following disclaimer in the documentation and/or
+       other materials provided with the distribution.
+
+    3. Neither the name of the copyright holder nor the names of its contributors
+       may be used to endorse or promote products derived from this software without
+       specific prior written permission.
+
+    THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+    IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+    INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT
+    NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+    PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+    WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+    ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY
+    OF SUCH DAMAGE.
+"""
+
+import json
+import asyncio
+from collections import deque
+import numpy as np
+
+
+class Subscription:
+    
+    def __init__(self, queue_size):
+        
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        
+        self.dropped = 0
+    
+    def publish(self, message):
+        
+        # Never waits: when the queue is full, the oldest message is dropped
+        if self.queue.full():
+            
+            self.queue.get_nowait()
+            
+            self.dropped += 1
+            
+        self.queue.put_nowait(message)
+
+
+class RealTimeServer:
+    
+    def __init__(self, model, intial_state, speed_factor=1., queue_size=64, history=1000):
+        
+        # One step of model._step_size simulated seconds takes step_size / speed_factor seconds of wall-clock time.
+        # history is the number of recent steps the latency and jitter percentiles are computed from
+        self._model = model
+        
+        self._state = np.array(intial_state, dtype=float)
+        
+        self._input = np.zeros(model._nu)
+        
+        self._speed_factor = speed_factor
+        
+        self._queue_size = queue_size
+        
+        self._subscriptions = set()
+        
+        self._servers = []
+        
+        # Writer -> task handling the connection
+        self._connections = {}
+        
+        self._running = False
+        
+        self._step = 0
+        
+        self._deadline_misses = 0
+        
+        # Messages dropped by subscribers that have already left
+        self._dropped_messages = 0
+        
+        # Step latency is the time from the wake-up to the published state, jitter is the wake-up lateness
+        self._latencies = deque(maxlen=history)
+        
+        self._jitters = deque(maxlen=history)
+    
+    @property
+    def state(self):
+        return self._state.copy()
+    
+    def set_input(self, input):
+        
+        input = np.asarray(input, dtype=float).reshape(-1)
+        
+        if input.shape[0] != self._model._nu:
+            raise Exception(f"Failed to set input. The input is expected to have {self._model._nu} elements, got {input.shape[0]}")
+        
+        self._input = input
+    
+    def reset(self, state):
+        
+        state = np.asarray(state, dtype=float).reshape(-1)
+        
+        if state.shape[0] != self._model._nx:
+            raise Exception(f"Failed to reset. The state is expected to have {self._model._nx} elements, got {state.shape[0]}")
+        
+        self._state = state
+    
+    def subscribe(self, queue_size=None):
+        
+        # In-process subscriber, receives the same encoded state messages as socket clients
+        subscription = Subscription(queue_size or self._queue_size)
+        
+        self._subscriptions.add(subscription)
+        
+        return subscription
+    
+    def unsubscribe(self, subscription):
+        
+        if subscription in self._subscriptions:
+            
+            self._subscriptions.discard(subscription)
+            
+            self._dropped_messages += subscription.dropped
+    
+    def metrics(self):
+        
+        latencies, jitters = np.array(self._latencies), np.array(self._jitters)
+        
+        def summary(samples):
+            
+            if len(samples) == 0:
+                return {"mean": None, "std": None, "p99": None, "max": None}
+            
+            return {"mean": float(samples.mean()), "std": float(samples.std()), "p99": float(np.percentile(samples, 99)), "max": float(samples.max())}
+        
+        return {"steps": self._step, "time": self._step * self._model._step_size, "speed_factor": self._speed_factor,
+                "deadline_misses": self._deadline_misses, "subscribers": len(self._subscriptions),
+                "dropped_messages": self._dropped_messages + sum(subscription.dropped for subscription in self._subscriptions),
+                "latency": summary(latencies), "jitter": summary(jitters)}
+    
+    async def start(self, host=None, port=None, path=None):
+        
+        # Listens on TCP when a port is given and on a UNIX socket when a path is given, or both
+        if port is None and path is None:
+            raise Exception("Failed to start real-time server. Please provide a TCP port or a UNIX socket path")
+        
+        if port is not None:
+            self._servers.append(await asyncio.start_server(self._handle_connection, host or "127.0.0.1", port))
+        
+        if path is not None:
+            self._servers.append(await asyncio.start_unix_server(self._handle_connection, path))
+        
+        print(f"[RealTimeServer][Info] Listening on {', '.join(str(socket.getsockname()) for server in self._servers for socket in server.sockets)}")
+    
+    async def run(self, steps=None):
+        
+        # Steps until stop() is called or the given number of steps has been simulated
+        loop = asyncio.get_running_loop()
+        
+        period = self._model._step_size / self._speed_factor
+        
+        self._running = True
+        
+        deadline = loop.time() + period
+        
+        wake_up = loop.time()
+        
+        end_step = None if steps is None else self._step + steps
+        
+        while self._running and (end_step is None or self._step < end_step):
+            
+            self._state = self._model.step(self._state, self._input)
+            
+            self._step += 1
+            
+            # Encoded once and shared by every subscriber
+            message = (json.dumps({"type": "state", "step": self._step, "time": self._step * self._model._step_size,
+                                   "state": self._state.tolist(), "input": self._input.tolist()}) + "\n").encode()
+            
+            for subscription in self._subscriptions:
+                subscription.publish(message)
+            
+            finish = loop.time()
+            
+            self._latencies.append(finish - wake_up)
+            
+            # A late step is not made up with a burst of steps, the schedule restarts from now
+            if finish > deadline:
+                
+                self._deadline_misses += 1
+                
+                deadline = finish
+            
+            await asyncio.sleep(deadline - finish)
+            
+            wake_up = loop.time()
+            
+            self._jitters.append(max(wake_up - deadline, 0.))
+            
+            deadline += period
+        
+        self._running = False
+    
+    def stop(self):
+        self._running = False
+    
+    async def close(self):
+        
+        self.stop()
+        
+        for server in self._servers:
+            
+            server.close()
+            
+            await server.wait_closed()
+        
+        # Closing a connection ends its handler, which is awaited instead of cancelled
+        tasks = list(self._connections.values())
+        
+        for writer in list(self._connections):
+            writer.close()
+        
+        await asyncio.gather(*tasks, return_exceptions=True)
+        
+        self._servers = []
+    
+    async def _handle_connection(self, reader, writer):
+        
+        # Every connection is a subscriber. Commands are read while the states are written by a separate task
+        subscription = self.subscribe()
+        
+        self._connections[writer] = asyncio.current_task()
+        
+        sender = asyncio.create_task(self._send_messages(subscription, writer))
+        
+        try:
+            while True:
+                
+                line = await reader.readline()
+                
+                if not line:
+                    break
+                
+                reply = self._handle_command(line)
+                
+                if reply is not None:
+                    subscription.publish((json.dumps(reply) + "\n").encode())
+        
+        except ConnectionError:
+            pass
+        
+        finally:
+            self.unsubscribe(subscription)
+            
+            self._connections.pop(writer, None)
+            
+            sender.cancel()
+            
+            writer.close()
+    
+    def _handle_command(self, line):
+        
+        try:
+            command = json.loads(line)
+            
+            if command.get("type") == "input":
+                self.set_input(command["input"])
+                
+            elif command.get("type") == "reset":
+                self.reset(command["state"])
+                
+            elif command.get("type") == "metrics":
+                return dict(self.metrics(), type="metrics")
+            
+            else:
+                raise Exception(f"Failed to handle command. The command type '{command.get('type')}' is not supported")
+        
+        except Exception as error:
+            return {"type": "error", "message": str(error)}
+        
+        return None
+    
+    @staticmethod
+    async def _send_messages(subscription, writer):
+        
+        try:
+            while True:
+                
+                writer.write(await subscription.queue.get())
+                
+                await writer.drain()
+        
+        except ConnectionError:
+            pass
@@ -0,0 +1,196 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+File: result_store.py
+
+Description:
+    This script defines the ResultStore class, which stores simulation results in a columnar binary format.
+    Every column (time, each state, each input and derived values) is a raw float64 file next to a JSON metadata header,
+    so results can be appended chunk by chunk and read back with np.memmap one column and range at a time.
+
+Author:
+    Loc Dang 
+
+Contact:
+    bobdbl99@gmail.com
+    
+Date:
+    October 17, 2026
+
+License:
+    BSD 3-Clause License
+
+    Redistribution and use in source and binary forms, with or without modification,
+    are permitted provided that the following conditions are met:
+
+    1. Redistributions of source code must retain the above copyright notice, this
+       list of conditions and the following disclaimer.
+
+    2. Redistributions in binary form must reproduce the above copyright notice, this
+       list of conditions and the following disclaimer in the documentation and/or
+       other materials provided with the distribution.
+
+    3. Neither the name of the copyright holder nor the names of its contributors
+       may be used to endorse or promote products derived from this software without
+       specific prior written permission.
+
+    THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+    IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+    INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT
+    NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+    PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+    WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+    ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY
+    OF SUCH DAMAGE.
+"""
+
+import os
+import json
+import numpy as np
+
+METADATA_FILENAME = "metadata.json"
+
+
+class ResultStore:
+    
+    def __init__(self, path, metadata, mode="r"):
+        
+        self._path = path
+        
+        self._metadata = metadata
+        
+        self._mode = mode
+        
+        self._files = {}
+        
+        self._derived = None
+    
+    @classmethod
+    def create(cls, path, state_names, input_names, derived=None, derived_names=(), metadata={}):
+        
+        # derived(states) returns the rows of derived_names for a chunk of states, e.g. the tractor pose
+        os.makedirs(path, exist_ok=True)
+        
+        columns = {"t": "time"}
+        
+        columns.update({name: "states" for name in state_names})
+        
+        columns.update({name: "inputs" for name in input_names})
+        
+        columns.update({name: "derived" for name in derived_names})
+        
+        if len(columns) != 1 + len(state_names) + len(input_names) + len(derived_names):
+            raise Exception("Failed to create result store. Column names must be unique")
+        
+        store = cls(path, {"columns": columns, "num_rows": 0, "dtype": "<f8", **metadata}, mode="w")
+        
+        store._derived = derived
+        
+        for name in columns:
+            store._files[name] = open(store._column_path(name), "wb")
+        
+        store._write_metadata()
+        
+        return store
+    
+    @classmethod
+    def open(cls, path):
+        
+        with open(os.path.join(path, METADATA_FILENAME), "r") as file:
+            metadata = json.load(file)
+            
+        return cls(path, metadata)
+    
+    @property
+    def metadata(self):
+        return self._metadata
+    
+    @property
+    def column_names(self):
+        return list(self._metadata["columns"].keys())
+    
+    def __len__(self):
+        return self._metadata["num_rows"]
+    
+    def write(self, time_axis, states, inputs):
+        
+        # Same signature as the sinks of Simulator.stream, so a store can be passed as sink
+        if self._mode != "w":
+            raise Exception(f"Failed to write result chunk. '{self._path}' was opened read-only")
+        
+        names = self.column_names
+        
+        groups = self._metadata["columns"]
+        
+        rows = [time_axis] + list(states) + list(inputs)
+        
+        if self._derived is not None:
+            rows += list(self._derived(states))
+        
+        if len(rows) != len(names):
+            raise Exception(f"Failed to write result chunk. Expected {len(names)} rows, got {len(rows)}")
+        
+        for name, row in zip(names, rows):
+            np.ascontiguousarray(row, dtype=self._metadata["dtype"]).tofile(self._files[name])
+        
+        for file in self._files.values():
+            file.flush()
+        
+        # Rows become visible to readers only after all columns were written
+        self._metadata["num_rows"] += len(time_axis)
+        
+        self._write_metadata()
+    
+    def close(self):
+        
+        for file in self._files.values():
+            file.close()
+            
+        self._files = {}
+    
+    def column(self, name, start=None, stop=None):
+        
+        # Memory-mapped view of one column, only the requested range is read from disk
+        if name not in self._metadata["columns"]:
+            raise Exception(f"Failed to read column '{name}'. Available columns: {', '.join(self.column_names)}")
+        
+        if len(self) == 0:
+            return np.zeros(0, dtype=self._metadata["dtype"])
+        
+        data = np.memmap(self._column_path(name), dtype=self._metadata["dtype"], mode="r", shape=(len(self),))
+        
+        return data[start:stop]
+    
+    def columns(self, names=None, start=None, stop=None):
+        
+        names = self.column_names if names is None else names
+        
+        return {name: self.column(name, start, stop) for name in names}
+    
+    def group(self, group, start=None, stop=None):
+        
+        # Stacked rows of one group ("time", "states", "inputs" or "derived"), this copies the selected range
+        names = [name for name, column_group in self._metadata["columns"].items() if column_group == group]
+        
+        return np.vstack([self.column(name, start, stop) for name in names])
+    
+    def _column_path(self, name):
+        
+        return os.path.join(self._path, f"{name}.bin")
+    
+    def _write_metadata(self):
+        
+        temporary_path = os.path.join(self._path, METADATA_FILENAME + ".tmp")
+        
+        with open(temporary_path, "w") as file:
+            json.dump(self._metadata, file, indent=4)
+        
+        os.replace(temporary_path, os.path.join(self._path, METADATA_FILENAME))
+    
+    @staticmethod
+    def simulation_metadata(model):
+        
+        return {"model": model.metadata(), "integrator": model._discrete_method, "step_size": model._step_size}
@@ -44,19 +44,140 @@ License:
     ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY
     OF SUCH DAMAGE.
 """
-import matplotlib.pyplot as plt
+import time
+from contextlib import nullcontext
 import numpy as np
 
+from simple_dynamics_simulator.backend import load_casadi, is_casadi_function
+from simple_dynamics_simulator.events import EventDetector
+
 
 class Simulator:
     
-    def __init__(self, model):
+    def __init__(self, model, instrumentation=None, cache=None):
         
         self._model = model
         
+        # Optional Instrumentation, see simple_dynamics_simulator/instrumentation.py
+        self._instrumentation = instrumentation
+        
+        # Optional ResultCache, see simple_dynamics_simulator/cache.py. Only run is cached
+        self._cache = cache
+        
         self._result = None
         
-    def run(self, intial_state, inputs):
+        self._events = []
+        
+        # Fused closed-loop functions per (controller, control hold, number of control intervals)
+        self._closed_loop_functions = {}
+        
+    @property
+    def events(self):
+        
+        # EventOccurrence list of the last run with events, see simple_dynamics_simulator/events.py
+        return self._events
+        
+    def run(self, intial_state, inputs, events=None):
+        
+        # With events, the run stops at the first terminal event. The last column of the result is then the
+        # state at the event and the last time is the event time, which lies between two steps. Runs with events
+        # are not cached, since the cache key does not cover the events
+        if events is not None:
+            return self._run_events(intial_state, inputs, events)
+        
+        if self._cache is None:
+            return self._run(intial_state, inputs)
+        
+        key = self._cache.key(self._model, intial_state, inputs)
+        
+        result = self._cache.get(key)
+        
+        if result is None:
+            
+            result = self._run(intial_state, inputs)
+            
+            self._cache.put(key, *result)
+            
+        else:
+            self._result = np.vstack(result)
+        
+        return result
+    
+    def _run(self, intial_state, inputs):
+        
+        if self._instrumentation is not None:
+            return self._run_instrumented(intial_state, inputs)
+        
+        intial_state, inputs, time_axis, states = self._prepare_run(intial_state, inputs)
+        
+        if self._model._compiled:
+            
+            horizon = self._model.compiled_horizon(inputs.shape[1])
+            
+            states[:, 1:] = horizon(intial_state, inputs).full()
+        
+        else:
+            for i in range(inputs.shape[1]):
+                states[:, i+1] = self._model.step(states[:, i], 
+                                                   inputs[:, i])
+        
+        return self._finish_run(time_axis, states, inputs)
+    
+    def _run_events(self, intial_state, inputs, events):
+        
+        # With instrumentation, every step is recorded including the event search inside it, and the step callbacks
+        # are called. Dynamics evaluations are not broken down into stages
+        instrumentation = self._instrumentation
+        
+        with instrumentation.run("run") if instrumentation is not None else nullcontext():
+            
+            with self._span("io/inputs", "io"):
+                intial_state, inputs, time_axis, states = self._prepare_run(intial_state, inputs)
+            
+            detector = EventDetector(events, self._model)
+            
+            detector.start(time_axis[0], states[:, 0])
+            
+            compiled_step = self._model.compiled_step() if self._model._compiled else None
+            
+            steps = inputs.shape[1]
+            
+            for i in range(steps):
+                
+                input = np.asarray(inputs[:, i], dtype=float)
+                
+                if instrumentation is not None:
+                    
+                    instrumentation.pre_step(i, states[:, i], input)
+                    
+                    start = time.perf_counter()
+                
+                next_state = compiled_step(states[:, i], input).full().ravel() if compiled_step is not None else None
+                
+                states[:, i+1], terminated = detector.advance(i, time_axis[i], states[:, i], input, next_state)
+                
+                if instrumentation is not None:
+                    
+                    instrumentation.record("step", start, time.perf_counter(), "integrator")
+                    
+                    instrumentation.post_step(i, states[:, i], input, states[:, i+1])
+                
+                if terminated:
+                    
+                    time_axis = time_axis[:i+2].copy()
+                    
+                    time_axis[-1] = detector.occurrences[-1].time
+                    
+                    states, inputs = states[:, :i+2], inputs[:, :i+1]
+                    
+                    break
+            
+            self._events = detector.occurrences
+            
+            with self._span("io/outputs", "io"):
+                return self._finish_run(time_axis, states, inputs)
+    
+    def _prepare_run(self, intial_state, inputs):
 
         intial_state = np.asarray(intial_state)
         
@@ -74,12 +195,365 @@ class Simulator:
         
         time_axis = np.linspace(0, steps * self._model._step_size, num=steps+1)
         
-        for i in range(steps):
-            states[:, i+1] = self._model.step(states[:, i], 
-                                               inputs[:, i])
+        return intial_state, inputs, time_axis, states
+    
+    def _finish_run(self, time_axis, states, inputs):
             
         inputs = np.hstack((inputs, np.zeros((self._model._nu, 1))))
         
         self._result = np.vstack((time_axis, states, inputs))
         
-        return time_axis, states, inputs
\ No newline at end of file
+        return time_axis, states, inputs
+    
+    def _run_instrumented(self, intial_state, inputs):
+        
+        # Same result as run, with every phase recorded. A compiled horizon is a single native call, so dynamics
+        # evaluations are not observable in compiled mode and step callbacks fall back to the compiled step
+        instrumentation = self._instrumentation
+        
+        with instrumentation.run("run"):
+            
+            with instrumentation.span("io/inputs", "io"):
+                intial_state, inputs, time_axis, states = self._prepare_run(intial_state, inputs)
+            
+            steps = inputs.shape[1]
+            
+            if self._model._compiled and not instrumentation.has_step_callbacks:
+                
+                with instrumentation.span("compiled_horizon", "integrator"):
+                    states[:, 1:] = self._model.compiled_horizon(steps)(intial_state, inputs).full()
+                
+                instrumentation.count_steps(steps)
+            
+            else:
+                compiled_step = self._model.compiled_step() if self._model._compiled else None
+                
+                dynamics = instrumentation.wrap_dynamics(self._model.dynamics)
+                
+                integrator = self._model._integrator
+                
+                for i in range(steps):
+                    
+                    state, input = states[:, i], np.asarray(inputs[:, i], dtype=float)
+                    
+                    instrumentation.pre_step(i, state, input)
+                    
+                    start = time.perf_counter()
+                    
+                    if compiled_step is not None:
+                        states[:, i+1] = compiled_step(state, input).full().ravel()
+                        
+                    else:
+                        states[:, i+1] = integrator.step(dynamics, state, input)
+                    
+                    instrumentation.record("step", start, time.perf_counter(), "integrator")
+                    
+                    instrumentation.post_step(i, state, input, states[:, i+1])
+            
+            with instrumentation.span("io/outputs", "io"):
+                return self._finish_run(time_axis, states, inputs)
+    
+    def run_closed_loop(self, intial_state, controller, reference=None, steps=None, control_period=None):
+        
+        # controller(state, reference, time) returns the input, either as a Python callable or a CasADi Function.
+        # reference is (nr, T) and column k is passed at step k. The input is held for control_period seconds, a
+        # multiple of step_size (default: one step). A CasADi controller with a non-adaptive integrator is fused
+        # with the model into one native function over the whole horizon
+        intial_state = np.asarray(intial_state, dtype=float)
+        
+        if reference is None:
+            
+            if steps is None:
+                raise Exception("Failed to run closed loop. Either the reference or the number of steps must be given")
+            
+            reference = np.zeros((0, steps))
+        
+        reference = np.asarray(reference, dtype=float)
+        
+        if reference.ndim == 1:
+            reference = reference.reshape(1, -1)
+        
+        steps = reference.shape[1] if steps is None else steps
+        
+        if reference.shape[1] < steps:
+            raise Exception(f"Failed to run closed loop. The reference has {reference.shape[1]} columns, at least {steps} are required")
+        
+        hold = self._control_hold(control_period)
+        
+        intervals = -(-steps // hold)
+        
+        states = np.zeros((self._model._nx, steps + 1))
+        
+        states[:, 0] = intial_state
+        
+        inputs = np.zeros((self._model._nu, steps))
+        
+        time_axis = np.linspace(0, steps * self._model._step_size, num=steps+1)
+        
+        update_steps = np.arange(intervals) * hold
+        
+        if is_casadi_function(controller) and not self._model._integrator.adaptive:
+            
+            closed_loop = self._closed_loop_function(controller, reference.shape[0], hold, intervals)
+            
+            _, interval_inputs, interval_states = closed_loop(intial_state, reference[:, update_steps], time_axis[update_steps].reshape(1, -1))
+            
+            states[:, 1:] = interval_states.full()[:, :steps]
+            
+            inputs[:] = np.repeat(interval_inputs.full(), hold, axis=1)[:, :steps]
+        
+        else:
+            for k in update_steps:
+                
+                if is_casadi_function(controller):
+                    input = controller(states[:, k], reference[:, k], time_axis[k]).full().ravel()
+                    
+                else:
+                    input = np.asarray(controller(states[:, k], reference[:, k], time_axis[k]), dtype=float).reshape(self._model._nu)
+                
+                for i in range(k, min(k + hold, steps)):
+                    
+                    inputs[:, i] = input
+                    
+                    states[:, i+1] = self._model.step(states[:, i], input)
+        
+        return self._finish_run(time_axis, states, inputs)
+    
+    def _control_hold(self, control_period):
+        
+        # Number of steps the input is held
+        if control_period is None:
+            return 1
+        
+        hold = int(round(control_period / self._model._step_size))
+        
+        if hold < 1 or abs(hold * self._model._step_size - control_period) > 1e-9 * max(1., control_period):
+            raise Exception(f"Failed to run closed loop. The control period {control_period} is not a multiple of the step size {self._model._step_size}")
+        
+        return hold
+    
+    def _closed_loop_function(self, controller, num_references, hold, intervals):
+        
+        key = (id(controller), hold, intervals)
+        
+        # The controller is stored with its function, so that its id cannot be reused while cached
+        if key not in self._closed_loop_functions:
+            
+            if controller.n_in() != 3 or controller.size1_in(0) != self._model._nx or controller.size1_in(1) != num_references or controller.numel_out(0) != self._model._nu:
+                raise Exception(f"Failed to compile closed loop. The controller is expected to map (state[{self._model._nx}], reference[{num_references}], time) to input[{self._model._nu}]")
+            
+            cs = load_casadi()
+            
+            state = cs.SX.sym("state", self._model._nx)
+            
+            reference = cs.SX.sym("reference", num_references)
+            
+            current_time = cs.SX.sym("time")
+            
+            input = cs.reshape(controller(state, reference, current_time), self._model._nu, 1)
+            
+            step = self._model.compiled_step()
+            
+            # One control interval: the input is computed once and held for every step of the interval
+            substates = []
+            
+            next_state = state
+            
+            for _ in range(hold):
+                
+                next_state = step(next_state, input)
+                
+                substates.append(next_state)
+            
+            control_interval = cs.Function("control_interval", [state, reference, current_time], [next_state, input, cs.horzcat(*substates)])
+            
+            self._closed_loop_functions[key] = (controller, control_interval.mapaccum("closed_loop", intervals))
+        
+        return self._closed_loop_functions[key][1]
+    
+    def run_batch(self, intial_states, inputs):
+        
+        # intial_states: (N, nx), inputs: (N, nu, T). Returns states with shape (N, nx, T+1)
+        intial_states = np.asarray(intial_states, dtype=float)
+        
+        inputs = np.asarray(inputs, dtype=float)
+        
+        if intial_states.ndim != 2 or intial_states.shape[1] != self._model._nx:
+            raise Exception(f"Failed to run batch. The initial states are expected to have shape (N, {self._model._nx}), got {intial_states.shape}")
+        
+        if inputs.ndim != 3 or inputs.shape[0] != intial_states.shape[0] or inputs.shape[1] != self._model._nu:
+            raise Exception(f"Failed to run batch. The inputs are expected to have shape ({intial_states.shape[0]}, {self._model._nu}, T), got {inputs.shape}")
+        
+        batch_size, steps = inputs.shape[0], inputs.shape[2]
+        
+        # Integrate in (T+1, nx, N) layout so that every step reads and writes one contiguous block
+        states = np.zeros((steps + 1, self._model._nx, batch_size))
+        
+        states[0] = intial_states.T
+        
+        time_axis = np.linspace(0, steps * self._model._step_size, num=steps+1)
+        
+        if self._model._compiled:
+            
+            # Every trajectory is an independent evaluation of the compiled horizon
+            horizon = self._model.compiled_horizon(steps).map(batch_size)
+            
+            mapped_inputs = inputs.transpose(1, 0, 2).reshape(self._model._nu, batch_size * steps)
+            
+            mapped_states = horizon(intial_states.T, mapped_inputs).full()
+            
+            states[1:] = mapped_states.reshape(self._model._nx, batch_size, steps).transpose(2, 0, 1)
+            
+        else:
+            stepped_inputs = np.ascontiguousarray(inputs.transpose(2, 1, 0))
+            
+            for i in range(steps):
+                states[i+1] = self._model.step(states[i], stepped_inputs[i])
+        
+        states = states.transpose(2, 1, 0)
+        
+        inputs = np.concatenate((inputs, np.zeros((batch_size, self._model._nu, 1))), axis=2)
+        
+        return time_axis, states, inputs
+    
+    def stream(self, intial_state, inputs, chunk_size=1024, sink=None):
+        
+        # Yields (time_axis, states, inputs) in chunks of chunk_size samples, where inputs[:, k] is applied to
+        # states[:, k]. inputs is a (nu, T) array, e.g. np.load(path, mmap_mode="r"), or an iterator of (nu,)
+        # vectors or (nu, k) blocks. Only one chunk is held in memory. The sink, if given, receives every chunk
+        # through sink.write(time_axis, states, inputs) and is closed when the inputs are exhausted.
+        if chunk_size < 1:
+            raise Exception(f"Failed to stream simulation. The chunk size must be positive, got {chunk_size}")
+        
+        state = np.asarray(intial_state, dtype=float)
+        
+        sample_index = 0
+        
+        pending = None
+        
+        run_context = nullcontext() if self._instrumentation is None else self._instrumentation.run("stream")
+        
+        try:
+            with run_context:
+                
+                for input_block in self._iterate_input_chunks(inputs, chunk_size):
+                    
+                    steps = input_block.shape[1]
+                    
+                    states = np.empty((self._model._nx, steps))
+                    
+                    start = time.perf_counter()
+                    
+                    if self._model._compiled:
+                        
+                        states[:, 0] = state
+                        
+                        next_states = self._model.compiled_horizon(steps)(state, input_block).full()
+                        
+                        states[:, 1:] = next_states[:, :-1]
+                        
+                        state = next_states[:, -1]
+                    
+                    else:
+                        for i in range(steps):
+                            
+                            states[:, i] = state
+                            
+                            state = self._model.step(state, input_block[:, i])
+                    
+                    if self._instrumentation is not None:
+                        
+                        self._instrumentation.record("stream/chunk", start, time.perf_counter(), "integrator")
+                        
+                        self._instrumentation.count_steps(steps)
+                    
+                    time_axis = (sample_index + np.arange(steps)) * self._model._step_size
+                    
+                    sample_index += steps
+                    
+                    # The previous chunk is held back so that the final state can be appended to a partial chunk
+                    if pending is not None:
+                        yield self._emit_chunk(pending, sink)
+                    
+                    pending = (time_axis, states, input_block)
+                
+                final_chunk = (np.array([sample_index * self._model._step_size]), state.reshape(self._model._nx, 1), np.zeros((self._model._nu, 1)))
+                
+                if pending is not None and pending[0].shape[0] < chunk_size:
+                    
+                    final_chunk = tuple(np.concatenate((pending_part, final_part), axis=-1) for pending_part, final_part in zip(pending, final_chunk))
+                    
+                elif pending is not None:
+                    yield self._emit_chunk(pending, sink)
+                
+                yield self._emit_chunk(final_chunk, sink)
+        
+        finally:
+            if sink is not None and hasattr(sink, "close"):
+                sink.close()
+    
+    def _iterate_input_chunks(self, inputs, chunk_size):
+        
+        if isinstance(inputs, np.ndarray):
+            
+            if inputs.ndim != 2 or inputs.shape[0] != self._model._nu:
+                raise Exception(f"Failed to stream simulation. The inputs are expected to have shape ({self._model._nu}, T), got {inputs.shape}")
+            
+            # Slicing a memory-mapped array only reads the requested columns from disk
+            for start in range(0, inputs.shape[1], chunk_size):
+                yield np.array(inputs[:, start:start + chunk_size], dtype=float)
+            
+            return
+        
+        block = np.empty((self._model._nu, chunk_size))
+        
+        filled = 0
+        
+        for item in inputs:
+            
+            item = np.asarray(item, dtype=float)
+            
+            if item.ndim == 1:
+                item = item.reshape(-1, 1)
+                
+            if item.shape[0] != self._model._nu:
+                raise Exception(f"Failed to stream simulation. Every input is expected to have {self._model._nu} rows, got {item.shape[0]}")
+            
+            start = 0
+            
+            while start < item.shape[1]:
+                
+                count = min(chunk_size - filled, item.shape[1] - start)
+                
+                block[:, filled:filled + count] = item[:, start:start + count]
+                
+                filled += count
+                
+                start += count
+                
+                if filled == chunk_size:
+                    
+                    yield block
+                    
+                    block = np.empty((self._model._nu, chunk_size))
+                    
+                    filled = 0
+        
+        if filled > 0:
+            yield block[:, :filled]
+    
+    def _emit_chunk(self, chunk, sink):
+        
+        if sink is not None:
+            
+            with self._span("io/sink", "io"):
+                sink.write(*chunk)
+            
+        return chunk
+    
+    def _span(self, name, category):
+        
+        if self._instrumentation is None:
+            return nullcontext()
+        
+        return self._instrumentation.span(name, category)
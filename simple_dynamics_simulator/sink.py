@@ -0,0 +1,89 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+File: sink.py
+
+Description:
+    This script defines sinks that write the chunks produced by Simulator.stream straight to disk.
+
+Author:
+    Loc Dang 
+
+Contact:
+    bobdbl99@gmail.com
+    
+Date:
+    October 17, 2026
+
+License:
+    BSD 3-Clause License
+
+    Redistribution and use in source and binary forms, with or without modification,
+    are permitted provided that the following conditions are met:
+
+    1. Redistributions of source code must retain the above copyright notice, this
+       list of conditions and the following disclaimer.
+
+    2. Redistributions in binary form must reproduce the above copyright notice, this
+       list of conditions and the following disclaimer in the documentation and/or
+       other materials provided with the distribution.
+
+    3. Neither the name of the copyright holder nor the names of its contributors
+       may be used to endorse or promote products derived from this software without
+       specific prior written permission.
+
+    THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+    IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+    INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT
+    NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+    PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+    WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+    ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY
+    OF SUCH DAMAGE.
+"""
+
+import csv
+import numpy as np
+
+
+class CsvSink:
+    
+    def __init__(self, file_path, state_names, input_names):
+        
+        self._file = open(file_path, "w", newline="")
+        
+        self._writer = csv.writer(self._file)
+        
+        self._writer.writerow(["t"] + list(state_names) + list(input_names))
+    
+    def write(self, time_axis, states, inputs):
+        
+        self._writer.writerows(np.vstack((time_axis, states, inputs)).T.tolist())
+    
+    def close(self):
+        
+        self._file.close()
+
+
+class BinarySink:
+    
+    # Rows of [t, states..., inputs...] stored as raw float64, readable without parsing through BinarySink.load
+    def __init__(self, file_path):
+        
+        self._file = open(file_path, "wb")
+    
+    def write(self, time_axis, states, inputs):
+        
+        np.ascontiguousarray(np.vstack((time_axis, states, inputs)).T).tofile(self._file)
+    
+    def close(self):
+        
+        self._file.close()
+    
+    @staticmethod
+    def load(file_path, num_states, num_inputs):
+        
+        return np.memmap(file_path, dtype=float, mode="r").reshape(-1, 1 + num_states + num_inputs)
@@ -0,0 +1,399 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+File: sweep.py
+
+Description:
+    This script defines the ParameterSweep class, which runs one simulation per point of a parameter grid
+    across a pool of worker processes and collects the resulting trajectories in shared memory.
+
+Author:
+    Loc Dang 
+
+Contact:
+    bobdbl99@gmail.com
+    
+Date:
+    October 17, 2026
+
+License:
+    BSD 3-Clause License
+
+    Redistribution and use in source and binary forms, with or without modification,
+    are permitted provided that the following conditions are met:
+
+    1. Redistributions of source code must retain the above copyright notice, this
+       list of conditions and the following disclaimer.
+
+    2. Redistributions in binary form must reproduce the above copyright notice, this
+       list of conditions and the following disclaimer in the documentation and/or
+       other materials provided with the distribution.
+
+    3. Neither the name of the copyright holder nor the names of its contributors
+       may be used to endorse or promote products derived from this software without
+       specific prior written permission.
+
+    THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+    IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT,
+    INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT
+    NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+    PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+    WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+    ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY
+    OF SUCH DAMAGE.
+"""
+
+import os
+import json
+import pickle
+import hashlib
+import itertools
+from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+
+from simple_dynamics_simulator.simulator import Simulator
+from simple_dynamics_simulator.cache import to_json_value
+from simple_dynamics_simulator.events import EventOccurrence
+
+# Parameters that change the shape of the result buffer cannot be swept
+FIXED_PARAMS = ("num_states", "num_inputs")
+
+# Per-process state of a sweep worker, set once by _initialize_worker
+_worker = {}
+
+# Terminal event of every point. event_index is -1 for points that ran the whole horizon, step is the column of the event state
+TERMINAL_EVENT_DTYPE = np.dtype([("event_index", np.int64), ("step", np.int64), ("time", float)])
+
+
+def expand_grid(grid):
+    
+    # {"length_back": [0.2, 0.3], "step_size": [0.1]} -> [{"length_back": 0.2, "step_size": 0.1}, ...]
+    names = list(grid.keys())
+    
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+
+def apply_overrides(params, overrides):
+    
+    # Keys are either dotted paths ("additional_params.length_back") or bare names
+    # that must appear in exactly one section of the model parameters
+    params = deepcopy(params)
+    
+    for key, value in overrides.items():
+        
+        path = key.split(".")
+        
+        if len(path) == 1:
+            
+            sections = [name for name, section in params.items() if isinstance(section, dict) and key in section]
+            
+            if len(sections) != 1:
+                raise Exception(f"Failed to apply override '{key}'. The parameter was found in {len(sections)} sections, use 'section.{key}' instead")
+            
+            path = [sections[0], key]
+        
+        if path[-1] in FIXED_PARAMS:
+            raise Exception(f"Failed to apply override '{key}'. '{path[-1]}' changes the size of the result and cannot be swept")
+        
+        target = params
+        
+        for name in path[:-1]:
+            target = target[name]
+        
+        if path[-1] not in target:
+            raise Exception(f"Failed to apply override '{key}'. The parameter does not exist")
+            
+        target[path[-1]] = value
+        
+    return params
+
+
+class ParameterSweep:
+    
+    def __init__(self, model_class, model_params, intial_state, inputs, points, output_dir=None, max_workers=None, events=None):
+        
+        self._model_class = model_class
+        
+        self._model_params = model_params
+        
+        self._intial_state = np.asarray(intial_state, dtype=float)
+        
+        self._inputs = np.asarray(inputs, dtype=float)
+        
+        self._points = list(points)
+        
+        self._output_dir = output_dir
+        
+        self._max_workers = max_workers
+        
+        # Events as for Simulator.run. Points that stop at a terminal event are padded with NaN after the event state
+        self._events = events
+        
+        # EventOccurrence or None per point, filled while the sweep runs
+        self._terminal_events = [None] * len(self._points)
+        
+        # Validate every point up front instead of failing inside a worker
+        for point in self._points:
+            apply_overrides(self._model_params, point)
+        
+        standard_params = self._model_params["standard_params"]
+        
+        self._shape = (len(self._points), standard_params["num_states"], self._inputs.shape[1] + 1)
+    
+    @property
+    def points(self):
+        return self._points
+    
+    @property
+    def terminal_events(self):
+        
+        # The terminal event of every point that has been yielded by iter_run, the state is the last finite column
+        return self._terminal_events
+    
+    def time_axis(self, point):
+        
+        step_size = apply_overrides(self._model_params, point)["standard_params"]["step_size"]
+        
+        steps = self._inputs.shape[1]
+        
+        return np.linspace(0, steps * step_size, num=steps+1)
+    
+    def run(self):
+        
+        # Returns the states of all points with shape (P, nx, T+1). With an output directory
+        # the result is a memory-mapped .npy file that stays valid after the sweep
+        if self._output_dir is not None:
+            
+            for _ in self.iter_run():
+                pass
+            
+            return np.load(os.path.join(self._output_dir, "states.npy"), mmap_mode="r")
+        
+        states = np.zeros(self._shape)
+        
+        for index, _, _, point_states, _ in self.iter_run():
+            states[index] = point_states
+        
+        return states
+    
+    def iter_run(self):
+        
+        # Yields (index, point, time_axis, states, terminal_event) in point order while the workers run ahead.
+        # terminal_event is an EventOccurrence or None. After a terminal event, time_axis holds the event time at
+        # the column of the event state and NaN like the states after it
+        if self._output_dir is not None:
+            buffer, terminal_events, done = self._open_output_dir()
+            
+            descriptor = ("file", self._output_dir, self._shape)
+            
+            shm = None
+            
+        else:
+            shm = shared_memory.SharedMemory(create=True, size=_shared_size(self._shape))
+            
+            buffer, terminal_events = _shared_arrays(shm.buf, self._shape)
+            
+            done = np.zeros(len(self._points), dtype=bool)
+            
+            descriptor = ("shm", shm.name, self._shape)
+        
+        # Workers set the flags of the output directory while the sweep runs, so take a snapshot
+        done = np.array(done)
+        
+        pending = [index for index in range(len(self._points)) if not done[index]]
+        
+        print(f"[ParameterSweep][Info] {len(pending)} of {len(self._points)} points to simulate")
+            
+        try:
+            with ProcessPoolExecutor(max_workers=self._max_workers,
+                                     initializer=_initialize_worker,
+                                     initargs=(self._model_class, self._model_params, self._intial_state, self._inputs, self._events, descriptor)) as executor:
+                
+                workers = self._max_workers or os.cpu_count() or 1
+                
+                chunksize = max(1, len(pending) // (4 * workers))
+                
+                finished = executor.map(_run_point, pending, [self._points[index] for index in pending], chunksize=chunksize)
+                
+                # Points that were completed by an earlier run are reported in order as well
+                next_pending = iter(finished)
+                
+                for index, point in enumerate(self._points):
+                    
+                    if not done[index]:
+                        next(next_pending)
+                    
+                    time_axis, terminal_event = self._terminal_event(index, point, terminal_events[index], buffer[index])
+                    
+                    self._terminal_events[index] = terminal_event
+                    
+                    yield index, point, time_axis, np.array(buffer[index]), terminal_event
+                    
+        finally:
+            del buffer, terminal_events
+            
+            if shm is not None:
+                shm.close()
+                
+                shm.unlink()
+    
+    def _terminal_event(self, index, point, terminal_event, states):
+        
+        time_axis = self.time_axis(point)
+        
+        if terminal_event["event_index"] < 0:
+            return time_axis, None
+        
+        step, event_index = int(terminal_event["step"]), int(terminal_event["event_index"])
+        
+        time_axis[step] = terminal_event["time"]
+        
+        time_axis[step + 1:] = np.nan
+        
+        return time_axis, EventOccurrence(self._events[event_index].name, event_index, step - 1, float(terminal_event["time"]), np.array(states[:, step]))
+    
+    def _open_output_dir(self):
+        
+        os.makedirs(self._output_dir, exist_ok=True)
+        
+        points_path = os.path.join(self._output_dir, "points.json")
+        
+        states_path = os.path.join(self._output_dir, "states.npy")
+        
+        done_path = os.path.join(self._output_dir, "done.npy")
+        
+        terminal_events_path = os.path.join(self._output_dir, "terminal_events.npy")
+        
+        if os.path.exists(points_path):
+            
+            with open(points_path, "r") as file:
+                stored = json.load(file)
+                
+            if stored != self._description():
+                raise Exception(f"Failed to resume sweep. '{self._output_dir}' contains the results of a different sweep")
+            
+            states = np.load(states_path, mmap_mode="r+")
+            
+            done = np.load(done_path, mmap_mode="r+")
+            
+            terminal_events = np.load(terminal_events_path, mmap_mode="r+")
+            
+        else:
+            states = np.lib.format.open_memmap(states_path, mode="w+", dtype=float, shape=self._shape)
+            
+            done = np.lib.format.open_memmap(done_path, mode="w+", dtype=bool, shape=(len(self._points),))
+            
+            terminal_events = np.lib.format.open_memmap(terminal_events_path, mode="w+", dtype=TERMINAL_EVENT_DTYPE, shape=(len(self._points),))
+            
+            states.flush()
+            
+            terminal_events.flush()
+            
+            done.flush()
+            
+            # Written last, so an interrupted setup is simply started again
+            with open(points_path, "w") as file:
+                json.dump(self._description(), file)
+            
+        return states, terminal_events, done
+    
+    def _description(self):
+        
+        # Stored in points.json. A resumed sweep must match the points and everything they are simulated with
+        return {"points": self._points, "shape": list(self._shape), "fingerprint": self._fingerprint()}
+    
+    def _fingerprint(self):
+        
+        model_class = f"{self._model_class.__module__}.{self._model_class.__qualname__}"
+        
+        hasher = hashlib.sha256(json.dumps({"model_class": model_class, "model_params": self._model_params},
+                                           sort_keys=True, default=to_json_value).encode())
+        
+        for array in (self._intial_state, self._inputs):
+            
+            hasher.update(str(array.shape).encode())
+            
+            hasher.update(np.ascontiguousarray(array).data)
+        
+        # Events are described by their pickle, which refers to the event functions by name
+        hasher.update(pickle.dumps(self._events))
+        
+        return hasher.hexdigest()
+
+
+def _initialize_worker(model_class, model_params, intial_state, inputs, events, descriptor):
+    
+    kind, location, shape = descriptor
+    
+    if kind == "shm":
+        
+        # Pool workers share the parent's resource tracker, which unlinks the block once the sweep is over
+        _worker["shm"] = shared_memory.SharedMemory(name=location)
+        
+        _worker["states"], _worker["terminal_events"] = _shared_arrays(_worker["shm"].buf, shape)
+        
+        _worker["done"] = None
+        
+    else:
+        _worker["states"] = np.load(os.path.join(location, "states.npy"), mmap_mode="r+")
+        
+        _worker["terminal_events"] = np.load(os.path.join(location, "terminal_events.npy"), mmap_mode="r+")
+        
+        _worker["done"] = np.load(os.path.join(location, "done.npy"), mmap_mode="r+")
+    
+    _worker["model_class"] = model_class
+    
+    _worker["model_params"] = model_params
+    
+    _worker["intial_state"] = intial_state
+    
+    _worker["inputs"] = inputs
+    
+    _worker["events"] = events
+
+
+def _run_point(index, point):
+    
+    # The model is built inside the worker, only the overrides travel through the pool
+    model = _worker["model_class"](apply_overrides(_worker["model_params"], point))
+    
+    simulator = Simulator(model)
+    
+    time_axis, states, _ = simulator.run(_worker["intial_state"], _worker["inputs"], _worker["events"])
+    
+    _worker["states"][index, :, :states.shape[1]] = states
+    
+    _worker["states"][index, :, states.shape[1]:] = np.nan
+    
+    # A terminal event ends the run, so it can only be the last occurrence. Its state is the last column
+    if len(simulator.events) > 0 and _worker["events"][simulator.events[-1].event_index].terminal:
+        _worker["terminal_events"][index] = (simulator.events[-1].event_index, states.shape[1] - 1, time_axis[-1])
+        
+    else:
+        _worker["terminal_events"][index] = (-1, -1, np.nan)
+    
+    # The mapping is shared with the file, so the flag marks the point as resumable once set
+    if _worker["done"] is not None:
+        _worker["done"][index] = True
+    
+    return index
+
+
+def _shared_size(shape):
+    
+    # One shared block holds the states followed by the terminal events
+    return max(int(np.prod(shape)) * 8 + shape[0] * TERMINAL_EVENT_DTYPE.itemsize, 1)
+
+
+def _shared_arrays(buffer, shape):
+    
+    states = np.ndarray(shape, dtype=float, buffer=buffer)
+    
+    terminal_events = np.ndarray((shape[0],), dtype=TERMINAL_EVENT_DTYPE, buffer=buffer, offset=int(np.prod(shape)) * 8)
+    
+    return states, terminal_events